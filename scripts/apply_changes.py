@@ -2,35 +2,65 @@
 """
 Apply categorized links to index.md.
 Replaces placeholder content with actual link lists.
+
+With --pages <yaml>, sections are spread over many Markdown pages (see
+page_map.py); pages are updated concurrently and only changed pages are
+written.
+
+With --changed-only, only the sections listed as changed in
+temp/snippets_manifest.json (written by generate_snippets.py) are updated.
+Changes stay listed there until a successful apply consumes them. Sections
+of categories whose snippet was removed (no links left) get a "Content TBC"
+placeholder.
+
+With --mode include, links are written to per-category Jekyll data files
+(see jekyll_data.py) and each section gets a single Liquid include instead
+of the literal link list; the page is rewritten only when an include is
+added or removed. The include of a category left without links is replaced
+by a "Content TBC" placeholder, since its data file is deleted.
 """
 
+import argparse
 import re
 from pathlib import Path
 
-# Mapping from category IDs to index.md section headings
-CATEGORY_TO_HEADING = {
-    '1.A': '### 1.A Team Models (centralised, embedded, hybrid)',
-    '1.B': '### 1.B Capacity & Resource Planning', 
-    '1.C': '### 1.C Governance & Standards',
-    '1.D': '### 1.D Onboarding & Knowledge Sharing',
-    '2.A.1': '#### 2.A.1 Foundations (colour, type, spacing)',
-    '2.A.2': '#### 2.A.2 Components (UI kits, patterns)',
-    '2.A.3': '#### 2.A.3 Documentation (usage guidelines, principles)',
-    '2.B': '### 2.B Toolchains & Platforms',
-    '2.C': '### 2.C Workflow Optimisation',
-    '2.D': '### 2.D Collaboration with Engineering',
-    '3.A': '### 3.A Testing & Accessibility',
-    '3.B': '### 3.B Metrics & Measurement',
-    '3.C': '### 3.C Feedback Loops',
-    '3.D': '### 3.D Continuous Improvement'
-}
+import run_log
+from generate_snippets import EMPTY_SECTION, MANIFEST_PATH, load_manifest, save_manifest
+from page_map import load_page_map, map_pages, section_index
+from taxonomy import load_taxonomy
+
+def load_changed_categories():
+    """Load the categories generate_snippets.py reported as changed and not yet applied."""
+    manifest = load_manifest()
+    if manifest is None:
+        print(f"Error: {MANIFEST_PATH} not found. Run generate_snippets.py first.")
+        return None
+    
+    return set(manifest.get('changed_categories', []))
 
-def load_snippets():
-    """Load all snippet files."""
+def consume_changed_categories(applied=None):
+    """Remove applied categories (all if None) from the manifest's pending changes."""
+    manifest = load_manifest()
+    if manifest is None:
+        return
+    
+    for key in ('changed_categories', 'removed_categories'):
+        manifest[key] = [
+            category_id for category_id in manifest.get(key, [])
+            if applied is not None and category_id not in applied
+        ]
+    save_manifest(manifest)
+
+def load_snippets(only_categories=None):
+    """Load all snippet files, or just those in only_categories."""
     snippets_dir = Path('temp/snippets')
     snippets = {}
     
-    for category_id in CATEGORY_TO_HEADING.keys():
+    for category_id in load_taxonomy().ids:
+        if only_categories is not None and category_id not in only_categories:
+            snippets[category_id] = ""
+            continue
+        
         snippet_file = snippets_dir / f"{category_id}.md"
         if snippet_file.exists():
             with open(snippet_file, 'r', encoding='utf-8') as f:
@@ -40,88 +70,169 @@ def load_snippets():
     
     return snippets
 
-def apply_changes():
-    """Apply snippet content to index.md sections."""
+def apply_to_content(content, snippets, category_ids, taxonomy, link_counts=None, retired=None):
+    """Replace the sections of category_ids in one page's content with their snippets.
+    
+    Link counts are taken from link_counts when given (for snippets that are
+    not Markdown link lists), otherwise counted in the snippet.
+    retired maps categories without a snippet to (marker, replacement): a
+    section still containing marker (any section if marker is None) is
+    replaced by replacement.
+    Returns (updated content, [(category_id, link count)] for updated sections).
+    """
+    lines = content.split('\n')
+    sections = section_index(lines, taxonomy)
+    
+    result_lines = []
+    updated = []
+    position = 0
+    
+    for category_id in sorted(sections, key=lambda category_id: sections[category_id][0]):
+        snippet = snippets.get(category_id)
+        heading_line, end = sections[category_id]
+        if not snippet and retired and category_id in retired:
+            marker, replacement = retired[category_id]
+            if marker is None or any(marker in line for line in lines[heading_line + 1:end]):
+                snippet = replacement
+        if category_id not in category_ids or not snippet:
+            continue
+        
+        # Keep everything up to the heading, then the snippet between blank lines
+        result_lines.extend(lines[position:heading_line + 1])
+        result_lines.extend(['', snippet, ''])
+        position = end
+        if link_counts is not None:
+            link_count = link_counts.get(category_id, 0)
+        else:
+            link_count = snippet.count('- [')
+        updated.append((category_id, link_count))
+    
+    result_lines.extend(lines[position:])
+    return '\n'.join(result_lines), updated
+
+def apply_page(page, category_ids, snippets, taxonomy, link_counts=None, retired=None):
+    """Apply snippets to one page file, writing it only if its content changed."""
+    if not page.exists():
+        return {'page': page, 'error': f"{page} not found", 'updated': [], 'written': False}
+    
+    with open(page, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    updated_content, updated = apply_to_content(content, snippets, category_ids, taxonomy, link_counts, retired)
+    written = updated_content != content
+    if written:
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write(updated_content)
+    
+    return {'page': page, 'error': None, 'updated': updated, 'written': written}
+
+@run_log.instrument('apply', result_name='sections_updated')
+def apply_changes(changed_only=False, pages_path=None, workers=None, mode='markdown'):
+    """Apply snippet content to the category sections of every mapped page.
+    
+    mode 'include' writes Jekyll data files and inserts Liquid includes instead.
+    """
     try:
         # Load snippets
-        snippets = load_snippets()
+        only_categories = None
+        if changed_only:
+            only_categories = load_changed_categories()
+            if only_categories is None:
+                return 0
+            if not only_categories:
+                print("No changed categories in snippet manifest - nothing to apply")
+                return 0
+            print(f"Limiting update to changed categories: {', '.join(sorted(only_categories))}")
         
-        # Read current index.md
-        index_path = Path('index.md')
-        with open(index_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        taxonomy = load_taxonomy()
+        page_map = load_page_map(pages_path, taxonomy)
         
-        lines = content.split('\n')
-        result_lines = []
+        link_counts = None
+        retired = None
+        if mode == 'include':
+            from jekyll_data import include_tag, write_link_data
+            link_counts = write_link_data()['link_counts']
+            snippets = {
+                category_id: include_tag(category_id)
+                for category_id in link_counts
+                if only_categories is None or category_id in only_categories
+            }
+            # Includes of categories whose data file was removed would render nothing
+            retired = {
+                category_id: (include_tag(category_id), EMPTY_SECTION)
+                for category_id in taxonomy.ids
+                if category_id not in link_counts
+            }
+        else:
+            snippets = load_snippets(only_categories)
+            # Categories whose snippet was deleted would otherwise keep their old links
+            retired = {
+                category_id: (None, EMPTY_SECTION)
+                for category_id in (load_manifest() or {}).get('removed_categories', [])
+            }
         
-        i = 0
-        changes_made = 0
+        results = map_pages(
+            lambda page: apply_page(page, frozenset(page_map[page]), snippets, taxonomy, link_counts, retired),
+            page_map, workers
+        )
         
-        while i < len(lines):
-            line = lines[i]
-            result_lines.append(line)
-            
-            # Check if this line matches a heading we want to update
-            category_to_update = None
-            for category_id, expected_heading in CATEGORY_TO_HEADING.items():
-                if line.strip() == expected_heading:
-                    category_to_update = category_id
-                    break
-            
-            if category_to_update and snippets[category_to_update]:
-                # Found a heading with content to insert
-                i += 1
-                
-                # Skip any existing content until next heading or end
-                start_skip = i
-                while i < len(lines):
-                    next_line = lines[i].strip()
-                    
-                    # Stop at next heading (starts with # or is a major section)
-                    if (next_line.startswith('#') or 
-                        next_line.startswith('## ') or 
-                        next_line.startswith('### ') or 
-                        next_line.startswith('#### ')):
-                        break
-                    i += 1
-                
-                # Insert empty line and snippet content
-                result_lines.append('')
-                result_lines.append(snippets[category_to_update])
-                result_lines.append('')
-                
-                changes_made += 1
-                print(f"  ✅ Updated {category_to_update} with {snippets[category_to_update].count('- [')} links")
-                
-                # Don't increment i here - we want to process the next heading
+        changes_made = 0
+        pages_written = 0
+        errors = 0
+        for result in results:
+            if result['error']:
+                print(f"  ❌ {result['error']}")
+                errors += 1
                 continue
-            else:
-                i += 1
-        
-        # Write updated content
-        updated_content = '\n'.join(result_lines)
-        
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+            for category_id, link_count in result['updated']:
+                print(f"  ✅ Updated {category_id} in {result['page']} with {link_count} links")
+            changes_made += len(result['updated'])
+            pages_written += result['written']
         
-        print(f"\n✅ Applied changes to index.md")
+        print(f"\n✅ Applied changes to {len(page_map)} page(s)")
         print(f"  - Sections updated: {changes_made}")
-        print(f"  - Total links added: {sum(snippet.count('- [') for snippet in snippets.values())}")
+        print(f"  - Pages written: {pages_written} (unchanged pages left untouched)")
+        if link_counts is not None:
+            print(f"  - Total links in data files: {sum(link_counts.values())}")
+        else:
+            print(f"  - Total links added: {sum(snippet.count('- [') for snippet in snippets.values())}")
         
-        return changes_made
+        # The applied changes are no longer pending for the next --changed-only run
+        if not errors:
+            consume_changed_categories(only_categories)
         
+        return changes_made
+    
     except Exception as e:
+        run_log.record_error(e)
         print(f"Fatal error applying changes: {e}")
         return 0
 
-if __name__ == '__main__':
+def main(argv=None):
+    """Command-line entry point."""
     import sys
     
-    print("Applying categorized links to index.md...")
-    changes = apply_changes()
+    parser = argparse.ArgumentParser(description="Apply categorized links to index.md")
+    parser.add_argument('--changed-only', action='store_true',
+                        help="only update sections whose snippets changed in the last generate_snippets run")
+    parser.add_argument('--pages', metavar='YAML',
+                        help="page map of Markdown pages to the categories they hold (default: index.md only)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="pages processed concurrently (default: up to 8)")
+    parser.add_argument('--mode', choices=['markdown', 'include'], default='markdown',
+                        help="markdown: splice link lists into the page; include: write _data/links/*.json "
+                             "and insert a Liquid include per section (default: markdown)")
+    args = parser.parse_args(argv)
+    
+    print("Applying categorized links to " + (f"pages in {args.pages}..." if args.pages else "index.md..."))
+    changes = apply_changes(changed_only=args.changed_only, pages_path=args.pages, workers=args.workers,
+                            mode=args.mode)
     
     if changes > 0:
         print(f"Successfully applied {changes} section updates")
     else:
         print("No changes were applied")
         sys.exit(1)
+
+if __name__ == '__main__':
+    main()
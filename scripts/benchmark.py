@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start cost of the designops commands.
+Imports each command's module the way `designops <command>` does, in a fresh
+interpreter with -X importtime, and reports total import time, wall-clock
+time and the heaviest imports. An empty interpreter is measured the same way
+as the baseline; light commands whose import time exceeds it by more than
+the target are flagged and make the benchmark exit non-zero.
+(`--help` is not used: argparse only loads its help formatter, shutil and
+textwrap when printing help, which a real run never pays for.)
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+CLI_PATH = Path(__file__).resolve().parent / 'designops.py'
+
+# Commands expected to start without loading heavy third-party dependencies
+LIGHT_COMMANDS = ['dry-run', 'snippets']
+
+# Import time a light command may add on top of an empty interpreter
+DEFAULT_TARGET_MS = 20.0
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$')
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into (total_us, [(cumulative_us, module), ...] top-level)."""
+    total_us = 0
+    top_level = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total_us += int(self_us)
+        # Top-level imports are indented by a single space
+        if len(indent) == 1:
+            top_level.append((int(cumulative_us), module.strip()))
+    top_level.sort(reverse=True)
+    return total_us, top_level
+
+def import_script(command):
+    """Return the -c script that imports a command like designops does (None: empty interpreter)."""
+    if command is None:
+        return 'pass'
+    return (f"import sys; sys.path.insert(0, {str(CLI_PATH.parent)!r}); "
+            f"import designops; designops.load_command({command!r})")
+
+def measure_command(command, repeat=5):
+    """Measure the best-of-N import and wall time for one command (None: empty interpreter)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', import_script(command)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        total_us, top_level = parse_importtime(result.stderr)
+        sample = {
+            'command': command,
+            'import_ms': total_us / 1000,
+            'wall_ms': wall_ms,
+            'heaviest_imports': [
+                {'module': module, 'cumulative_ms': us / 1000} for us, module in top_level[:5]
+            ]
+        }
+        if best is None or sample['import_ms'] < best['import_ms']:
+            best = sample
+    return best
+
+def main(argv=None):
+    """Command-line entry point."""
+    import designops
+
+    parser = argparse.ArgumentParser(description="Report cold-start import time per designops command")
+    parser.add_argument('commands', nargs='*',
+                        help="commands to measure (default: all)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="runs per command; the fastest is reported (default: 5)")
+    parser.add_argument('--target-ms', type=float, default=DEFAULT_TARGET_MS,
+                        help=f"import time {', '.join(LIGHT_COMMANDS)} may add to an empty "
+                             f"interpreter (default: {DEFAULT_TARGET_MS:.0f})")
+    parser.add_argument('--json', action='store_true',
+                        help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    commands = args.commands or [name for name in designops.COMMANDS if name != 'benchmark']
+    baseline = measure_command(None, repeat=args.repeat)
+    results = [measure_command(command, repeat=args.repeat) for command in commands]
+    for result in results:
+        result['added_ms'] = result['import_ms'] - baseline['import_ms']
+        result['light'] = result['command'] in LIGHT_COMMANDS
+        result['meets_target'] = not result['light'] or result['added_ms'] <= args.target_ms
+
+    if args.json:
+        print(json.dumps({'baseline': baseline, 'target_ms': args.target_ms, 'commands': results}, indent=2))
+    else:
+        print(f"Empty interpreter: {baseline['import_ms']:.1f} ms import, {baseline['wall_ms']:.1f} ms wall")
+        print(f"   {'command':<12} {'import ms':>10} {'added ms':>9} {'wall ms':>9}  heaviest imports")
+        for result in results:
+            heaviest = ', '.join(
+                f"{item['module']} {item['cumulative_ms']:.1f}" for item in result['heaviest_imports'][:3]
+            )
+            flag = '  ' if not result['light'] else ('✅' if result['meets_target'] else '❌')
+            print(f"{flag} {result['command']:<12} {result['import_ms']:>10.1f} {result['added_ms']:>9.1f} "
+                  f"{result['wall_ms']:>9.1f}  {heaviest}")
+
+    too_slow = [result for result in results if not result['meets_target']]
+    for result in too_slow:
+        print(f"❌ {result['command']} adds {result['added_ms']:.1f} ms of imports "
+              f"(target {args.target_ms:.1f} ms)", file=sys.stderr)
+    if too_slow:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
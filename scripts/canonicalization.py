@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Host-specific URL canonicalization rules from config/canonicalization.yml.
+
+normalize_url() lowercases the scheme and host and drops trailing slashes
+and fragments; these rules then remove query parameters that only track
+the visitor, fold host aliases ("m.", "mobile.", bare vs "www.") into one
+host and rewrite paths (e.g. AMP variants), so the same resource found
+under different URLs is recognised as a duplicate.
+
+    drop_params: ["utm_*", gclid, ...]       # every host; "*" matches a prefix
+    hosts:
+      "youtube.com": {host: www.youtube.com}
+      "*.medium.com": {drop_params: [source]} # any subdomain, not medium.com
+      "www.example.com":
+        path_rewrites: [{pattern: "/amp$", replace: ""}]
+
+The rules are compiled once into an exact host -> rule table plus a suffix
+trie (reversed host labels) for wildcard keys; the most specific key wins.
+A host alias hands over to the rule of its canonical host, so an alias URL
+also gets that host's parameter and path rules. The chain of rules for each
+host seen is memoized, so a URL costs one dict hit plus the rules that
+apply to its host. A query is left exactly as written (order, encoding,
+blank values) unless a parameter is actually removed.
+
+Parsed rules are cached in temp/canonicalization_cache.json keyed by the
+YAML file's mtime and size, like the taxonomy, so normalizing never loads
+PyYAML once the cache is warm. Without the config file only the default
+tracking parameters are dropped.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import unquote_plus
+
+CONFIG_PATH = Path('config/canonicalization.yml')
+CACHE_PATH = Path('temp/canonicalization_cache.json')
+
+# Used when config/canonicalization.yml does not exist
+DEFAULT_RULES = {
+    'drop_params': ['utm_*', 'gclid', 'fbclid', 'mc_cid', 'mc_eid'],
+    'hosts': {}
+}
+
+class ParamFilter:
+    """Parameter names to drop: exact names plus "prefix*" patterns."""
+
+    def __init__(self, patterns):
+        patterns = [str(pattern) for pattern in patterns]
+        self.names = frozenset(pattern for pattern in patterns if not pattern.endswith('*'))
+        self.prefixes = tuple(pattern[:-1] for pattern in patterns if pattern.endswith('*'))
+
+    def __contains__(self, name):
+        return name in self.names or (bool(self.prefixes) and name.startswith(self.prefixes))
+
+    def __bool__(self):
+        return bool(self.names or self.prefixes)
+
+def param_name(pair):
+    """Return the decoded name of one "name=value" query pair."""
+    return unquote_plus(pair.split('=', 1)[0])
+
+def filter_query(query, drop):
+    """Remove parameters named in drop; the query is returned as is if none match."""
+    if not query or not drop:
+        return query
+    pairs = query.split('&')
+    kept = [pair for pair in pairs if param_name(pair) not in drop]
+    if len(kept) == len(pairs):
+        return query
+    return '&'.join(kept)
+
+def split_netloc(netloc):
+    """Split a netloc into (userinfo prefix, host, port suffix)."""
+    userinfo, at, hostport = netloc.rpartition('@')
+    host, colon, port = hostport, '', ''
+    if not hostport.endswith(']') and ':' in hostport:
+        host, colon, port = hostport.rpartition(':')
+    return userinfo + at, host, colon + port
+
+class HostRule:
+    """The compiled rule of one host key, merged with the global parameters."""
+
+    def __init__(self, key, rule, global_params):
+        rule = rule or {}
+        self.key = key
+        self.host = rule['host'].lower() if rule.get('host') else None
+        self.drop = ParamFilter(list(global_params) + list(rule.get('drop_params', [])))
+        self.path_rewrites = [
+            (re.compile(rewrite['pattern']), rewrite.get('replace', ''))
+            for rewrite in rule.get('path_rewrites', [])
+        ]
+
+    def apply(self, netloc, host, path, query):
+        """Return (netloc, path, query) with this rule applied."""
+        if self.host and self.host != host:
+            userinfo, _, port = split_netloc(netloc)
+            netloc = userinfo + self.host + port
+        for pattern, replace in self.path_rewrites:
+            path = pattern.sub(replace, path)
+        if self.path_rewrites:
+            path = path.rstrip('/')
+        return netloc, path, filter_query(query, self.drop)
+
+class Canonicalizer:
+    """Canonicalization rules compiled into host lookup tables."""
+
+    def __init__(self, rules):
+        self.global_params = list(rules.get('drop_params', []))
+        self.default_rule = HostRule(None, None, self.global_params)
+        self.exact = {}
+        # Reversed host labels -> node; node['*'] holds a wildcard rule for its subdomains
+        self.trie = {}
+        for key, rule in (rules.get('hosts') or {}).items():
+            key = key.lower()
+            compiled = HostRule(key, rule, self.global_params)
+            if key.startswith('*.'):
+                node = self.trie
+                for label in reversed(key[2:].split('.')):
+                    node = node.setdefault(label, {})
+                node['*'] = compiled
+            else:
+                self.exact[key] = compiled
+        self.host_rules = {}
+
+    def lookup(self, host):
+        """Find the most specific rule for a host: exact key, then the longest wildcard."""
+        rule = self.exact.get(host)
+        if rule is not None:
+            return rule
+        labels = host.split('.')
+        node = self.trie
+        # A wildcard only matches hosts with at least one more label in front
+        for label in reversed(labels[1:]):
+            node = node.get(label)
+            if node is None:
+                break
+            if '*' in node:
+                rule = node['*']
+        return rule or self.default_rule
+
+    def rules_for(self, host):
+        """Return the (memoized) [(host, rule)] chain for a host, following host aliases."""
+        chain = self.host_rules.get(host)
+        if chain is None:
+            chain = self.host_rules[host] = alias_chain(host, self.lookup)
+        return chain
+
+    def apply(self, netloc, path, query):
+        """Canonicalize the netloc, path and query of an already lowercased URL."""
+        for host, rule in self.rules_for(split_netloc(netloc)[1]):
+            netloc, path, query = rule.apply(netloc, host, path, query)
+        return netloc, path, query
+
+def alias_chain(host, lookup):
+    """Return [(host, rule)] from a host through the canonical hosts its aliases name."""
+    chain = []
+    seen = set()
+    # An alias cycle stops at the first host seen twice
+    while host not in seen:
+        seen.add(host)
+        rule = lookup(host)
+        chain.append((host, rule))
+        if not rule.host or rule.host == host:
+            break
+        host = rule.host
+    return chain
+
+def reference_rule(rules, host):
+    """Reference lookup: scan every host key (used to check Canonicalizer.lookup)."""
+    best_key = None
+    for key in (rules.get('hosts') or {}):
+        pattern = key.lower()
+        if pattern == host:
+            return pattern
+        if pattern.startswith('*.') and host.endswith(pattern[1:]) and len(host) > len(pattern) - 1:
+            if best_key is None or len(pattern) > len(best_key):
+                best_key = pattern
+    return best_key
+
+def reference_apply(rules, netloc, path, query):
+    """Reference canonicalization without compiled tables or memoization."""
+    hosts = {pattern.lower(): value for pattern, value in (rules.get('hosts') or {}).items()}
+
+    def lookup(host):
+        key = reference_rule(rules, host)
+        return HostRule(key, hosts[key] if key is not None else None, rules.get('drop_params', []))
+
+    for host, rule in alias_chain(split_netloc(netloc)[1], lookup):
+        netloc, path, query = rule.apply(netloc, host, path, query)
+    return netloc, path, query
+
+def file_signature(path):
+    """Return [mtime_ns, size] of a file, or None if it does not exist."""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def load_rules(config_path=CONFIG_PATH, cache_path=CACHE_PATH):
+    """Return the rules dict, from the JSON cache when the YAML file is unchanged."""
+    config_path = Path(config_path)
+    signature = file_signature(config_path)
+    if signature is None:
+        return DEFAULT_RULES
+
+    key = str(config_path.resolve())
+    cache_path = Path(cache_path)
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('source') == key and cache.get('signature') == signature:
+                return cache['rules']
+        except (OSError, ValueError):
+            pass
+
+    # Imported lazily so normalizing with a warm cache never loads PyYAML
+    import yaml
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        rules = yaml.safe_load(f) or {}
+    rules = {'drop_params': rules.get('drop_params') or [], 'hosts': rules.get('hosts') or {}}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': key, 'signature': signature, 'rules': rules}, f, indent=2, ensure_ascii=False)
+    except OSError:
+        pass
+    return rules
+
+def fingerprint(config_path=CONFIG_PATH):
+    """Return a SHA-256 of the rule file's content (for caches of normalized URLs)."""
+    config_path = Path(config_path)
+    if not config_path.exists():
+        return hashlib.sha256(json.dumps(DEFAULT_RULES, sort_keys=True).encode('utf-8')).hexdigest()
+    with open(config_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+_memo = {}
+
+def default_canonicalizer():
+    """Return the process-wide Canonicalizer for config/canonicalization.yml."""
+    canonicalizer = _memo.get('default')
+    if canonicalizer is None:
+        canonicalizer = _memo['default'] = Canonicalizer(load_rules())
+    return canonicalizer
+
+def reset():
+    """Forget the compiled rules, e.g. after config/canonicalization.yml changes."""
+    _memo.clear()
@@ -4,35 +4,64 @@ Categorize normalized links using strict keyword matching rules.
 Takes temp/links_normalized.json and config/categories.yml to produce temp/categorized.json
 """
 
+import argparse
 import json
 import csv
 import sys
-import yaml
 from pathlib import Path
 from collections import defaultdict
 
+import link_store
+import run_log
+from checkpoint import DEFAULT_BATCH_SIZE, Checkpoint
+from keyword_engine import MATCH_WORD, KeywordEngine, keyword_matches, keyword_spec, tokenize
+from taxonomy import CONFIG_PATH, load_taxonomy
+
 def load_categories():
-    """Load categorization rules from YAML config."""
-    config_path = Path('config/categories.yml')
-    if not config_path.exists():
-        print("Error: config/categories.yml not found", file=sys.stderr)
-        sys.exit(1)
-        
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
-    
-    return config['categories']
+    """Load categorization rules from the shared taxonomy registry."""
+    return load_taxonomy().categories
 
 def match_keywords(text, keywords):
-    """Check if any keyword matches in text (case-insensitive)."""
+    """Check if any keyword matches in text (case-insensitive).
+    
+    Reference implementation; KeywordEngine produces the same matches faster.
+    """
     text_lower = text.lower()
-    for keyword in keywords:
-        if keyword.lower() in text_lower:
+    tokens = None
+    for entry in keywords:
+        keyword, mode = keyword_spec(entry)
+        if mode == MATCH_WORD and tokens is None:
+            tokens = tokenize(text_lower)
+        if keyword_matches(keyword, mode, text_lower, tokens):
             return True, keyword
     return False, None
 
-def categorize_link(link, categories, duplicates_lookup):
-    """Categorize a single link using the rules."""
+def find_matches(href_norm, text, categories, engine=None):
+    """Return [(category_id, matched_keyword)] for a URL and text, in priority order."""
+    if engine is not None:
+        return engine.match(href_norm, text)
+    
+    search_text = f"{href_norm} {text}"
+    matches = []
+    
+    for category_id, category_data in categories.items():
+        keywords = category_data.get('keywords', [])
+        is_match, matched_keyword = match_keywords(search_text, keywords)
+        if is_match:
+            matches.append((category_id, matched_keyword))
+    
+    return matches
+
+def categorize_link(link, categories, duplicates_lookup, engine=None, published=None):
+    """Categorize a single link using the rules.
+    
+    With an engine (KeywordEngine compiled from the same categories) keyword
+    matching uses its token index; otherwise the reference scan is used.
+    Links enriched by enrich_links.py fall back to their fetched page
+    metadata (`meta_text`) when the URL and anchor text match nothing.
+    With published (a PublishedLinks index of index.md), links already on
+    the page are skipped before any matching.
+    """
     link_id = link['id']
     href_norm = link['href_norm']
     text_norm = link['text_norm']
@@ -48,6 +77,17 @@ def categorize_link(link, categories, duplicates_lookup):
             'reason': f"invalid_url: {link['invalid_reason']}"
         }
     
+    # Skip links already published in index.md
+    if published is not None and href_norm in published:
+        return {
+            'id': link_id,
+            'href_norm': href_norm,
+            'text_final': text_norm,
+            'category': None,
+            'action': 'skipped',
+            'reason': 'already_published'
+        }
+    
     # Skip duplicates (keep only canonical)
     if href_norm in duplicates_lookup and duplicates_lookup[href_norm] != link_id:
         canonical_id = duplicates_lookup[href_norm]
@@ -61,14 +101,13 @@ def categorize_link(link, categories, duplicates_lookup):
         }
     
     # Try to match against categories (in order of specificity)
-    search_text = f"{href_norm} {text_norm}"
-    matches = []
+    matches = find_matches(href_norm, text_norm, categories, engine)
+    via = ''
     
-    for category_id, category_data in categories.items():
-        keywords = category_data.get('keywords', [])
-        is_match, matched_keyword = match_keywords(search_text, keywords)
-        if is_match:
-            matches.append((category_id, matched_keyword))
+    # Fall back to fetched page metadata for weak anchor text
+    if not matches and link.get('meta_text'):
+        matches = find_matches(href_norm, f"{text_norm} {link['meta_text']}", categories, engine)
+        via = ' (via:metadata)'
     
     # Handle multiple matches - take first one (most specific)
     if len(matches) == 1:
@@ -79,7 +118,7 @@ def categorize_link(link, categories, duplicates_lookup):
             'text_final': text_norm,
             'category': category_id,
             'action': 'added',
-            'reason': f"matched_keyword:{matched_keyword}"
+            'reason': f"matched_keyword:{matched_keyword}{via}"
         }
     elif len(matches) > 1:
         # Multiple matches - take the first one (most specific by order)
@@ -91,7 +130,7 @@ def categorize_link(link, categories, duplicates_lookup):
             'text_final': text_norm,
             'category': category_id,
             'action': 'added',
-            'reason': f"matched_keyword:{matched_keyword} (also_matched:{','.join(other_matches)})"
+            'reason': f"matched_keyword:{matched_keyword} (also_matched:{','.join(other_matches)}){via}"
         }
     else:
         # No matches
@@ -105,7 +144,7 @@ def categorize_link(link, categories, duplicates_lookup):
         }
 
 def build_duplicates_lookup():
-    """Build lookup of URL -> canonical ID for duplicate detection."""
+    """Build lookup of URL -> canonical ID for duplicate detection (URL matches only)."""
     duplicates_path = Path('temp/duplicates.csv')
     duplicates_lookup = {}
     
@@ -113,14 +152,26 @@ def build_duplicates_lookup():
         with open(duplicates_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
+                # Fuzzy text matches are reported for review, not skipped
+                if row.get('match_type', 'url') != 'url':
+                    continue
                 href_norm = row['href_norm']
                 canonical_id = row['canonical_id']
                 duplicates_lookup[href_norm] = canonical_id
     
     return duplicates_lookup
 
-def categorize_links():
-    """Main categorization function."""
+@run_log.instrument('categorize')
+def categorize_links(categories=None, engine=None, skip_published=False, resume=False,
+                     batch_size=DEFAULT_BATCH_SIZE):
+    """Main categorization function.
+    
+    categories, when given, are used instead of re-reading config/categories.yml;
+    engine, when given, must be a KeywordEngine compiled from those categories.
+    skip_published skips links whose URL is already linked from index.md.
+    Progress is checkpointed every batch_size links; resume continues from
+    the last committed batch of an interrupted run (see checkpoint.py).
+    """
     try:
         # Load normalized links
         normalized_path = Path('temp/links_normalized.json')
@@ -132,17 +183,31 @@ def categorize_links():
             links = json.load(f)
         
         # Load categories and duplicates
-        categories = load_categories()
+        if categories is None:
+            categories = load_categories()
+        if engine is None:
+            engine = KeywordEngine(categories)
         duplicates_lookup = build_duplicates_lookup()
         
+        published = None
+        if skip_published:
+            from published_links import load_published_links
+            published = load_published_links()
+            print(f"Skipping links already published in index.md ({len(published)} URLs)")
+        
         print(f"Categorizing {len(links)} links using {len(categories)} categories")
         
-        # Process each link
-        categorized_links = []
-        stats = defaultdict(int)
+        # Resume from the last committed batch, if asked to
+        inputs = [normalized_path, Path('temp/duplicates.csv'), CONFIG_PATH]
+        if skip_published:
+            inputs.append(Path('index.md'))
+        checkpoint = Checkpoint('categorize', inputs, batch_size)
+        categorized_links, saved_stats = checkpoint.start(resume)
+        stats = defaultdict(int, saved_stats or {})
         
-        for link in links:
-            result = categorize_link(link, categories, duplicates_lookup)
+        # Process each link
+        for link in links[len(categorized_links):]:
+            result = categorize_link(link, categories, duplicates_lookup, engine, published)
             categorized_links.append(result)
             
             # Track stats
@@ -153,6 +218,10 @@ def categorize_links():
                 reason_key = result['reason'].split(':')[0]  # Get reason type
                 stats[f"skipped_{reason_key}"] += 1
                 stats['total_skipped'] += 1
+            
+            if checkpoint.add(result):
+                # Links are in order_index order, starting at 0
+                checkpoint.commit(dict(stats), len(categorized_links) - 1)
         
         # Print stats
         print(f"\nCategorization results:")
@@ -185,25 +254,73 @@ def categorize_links():
             for reason, count in sorted(skip_counts.items()):
                 print(f"    - {reason}: {count}")
         
+        # Match cache profile
+        cache_report = engine.cache_report()
+        print(f"\n  Match cache:")
+        print(f"    - URL host/path segments: {cache_report['url_segment_hit_rate']}% hit rate "
+              f"({cache_report['url_segment_cache_hits']}/{cache_report['url_segment_lookups']}, "
+              f"{cache_report['unique_url_segments']} unique)")
+        print(f"    - Tokens: {cache_report['token_hit_rate']}% hit rate "
+              f"({cache_report['token_cache_hits']}/{cache_report['token_lookups']}, "
+              f"{cache_report['unique_tokens']} unique)")
+        
+        run_log.record_cache('url_segments', cache_report['url_segment_cache_hits'], cache_report['url_segment_lookups'])
+        run_log.record_cache('tokens', cache_report['token_cache_hits'], cache_report['token_lookups'])
+        run_log.record_counts(category_counts, prefix='added_')
+        run_log.record_counts(skip_counts, prefix='skipped_')
+        
+        if published is not None:
+            run_log.record_counts(published.stats, prefix='published_')
+            print(f"    - Published-link filter: {published.stats['bloom_rejections']}/{published.stats['lookups']} "
+                  f"rejected by Bloom filter, {published.stats['false_positives']} false positives")
+        
         # Write categorized results
         output_path = Path('temp/categorized.json')
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(categorized_links, f, indent=2, ensure_ascii=False)
         print(f"\nWrote categorized links to {output_path}")
         
+        # Append this run to the cross-run history
+        conn = link_store.connect()
+        try:
+            run_id = link_store.record_run(conn, categorized_links)
+        finally:
+            conn.close()
+        print(f"Recorded run {run_id} in {link_store.STORE_PATH}")
+        
+        checkpoint.finish()
+        
         return {
             'total_processed': len(categorized_links),
             'total_added': stats['total_added'],
             'total_skipped': stats['total_skipped'],
             'category_counts': category_counts,
-            'skip_counts': skip_counts
+            'skip_counts': skip_counts,
+            'match_cache': cache_report,
+            'published_filter': published.stats if published is not None else None,
+            'run_id': run_id
         }
-        
+    
     except Exception as e:
+        run_log.record_error(e)
         print(f"Fatal error during categorization: {e}", file=sys.stderr)
         sys.exit(1)
 
-if __name__ == '__main__':
-    stats = categorize_links()
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Categorize normalized links using config/categories.yml")
+    parser.add_argument('--skip-published', action='store_true',
+                        help="skip links whose URL is already linked from index.md (reason: already_published)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue from the last checkpoint of an interrupted run")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"links per checkpoint batch (default: {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args(argv)
+    
+    stats = categorize_links(skip_published=args.skip_published, resume=args.resume,
+                             batch_size=args.checkpoint_every)
     print(f"\nSuccessfully categorized {stats['total_processed']} links")
     print(f"Added: {stats['total_added']}, Skipped: {stats['total_skipped']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Batch checkpoints so long stages can resume after a crash.
+
+A stage processing records in order appends each finished record to
+temp/checkpoints/<stage>.partial.jsonl and, every batch_size records,
+commits: the buffered records are flushed and fsynced, then
+temp/checkpoints/<stage>.json is atomically replaced (write + os.replace)
+with the number of records done, the last order_index and the stage's
+partial stats. A crash between commits loses at most one batch; on
+--resume the partial file is truncated back to the last committed length
+and the stage continues with the next record.
+
+The checkpoint also stores a SHA-256 signature of the stage's inputs. If
+any input changed since the checkpoint was written, resuming starts over,
+so a resumed run always produces the same outputs as an uninterrupted one.
+The checkpoint files are removed once the stage has written its outputs.
+
+pipeline.py keeps temp/checkpoints/pipeline.json with the stages finished
+in the current run, so `designops run --resume` also skips completed stages.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CHECKPOINT_DIR = Path('temp/checkpoints')
+DEFAULT_BATCH_SIZE = 500
+
+def input_signature(paths):
+    """Return a SHA-256 over the contents of the given files (missing files included)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        digest.update(str(path).encode('utf-8') + b'\0')
+        if path.exists():
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file, fsync it and rename it over path."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class Checkpoint:
+    """Committed progress of one stage over an ordered list of records."""
+
+    def __init__(self, stage, inputs, batch_size=DEFAULT_BATCH_SIZE, checkpoint_dir=CHECKPOINT_DIR):
+        self.stage = stage
+        self.batch_size = batch_size
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.state_path = self.checkpoint_dir / f"{stage}.json"
+        self.partial_path = self.checkpoint_dir / f"{stage}.partial.jsonl"
+        self.signature = input_signature(inputs)
+        self.position = 0
+        self.pending = []
+        self.partial_file = None
+
+    def start(self, resume=False):
+        """Open the checkpoint and return (done records, saved stats or None).
+
+        With resume and a checkpoint matching the current inputs, the records
+        committed so far are returned; otherwise any old checkpoint is discarded.
+        """
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        records, stats = [], None
+
+        state = None
+        if resume and self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('input_signature') != self.signature:
+                print(f"  Inputs changed since the {self.stage} checkpoint - starting over")
+                state = None
+
+        if state is not None and (not self.partial_path.exists()
+                                  or self.partial_path.stat().st_size < state['partial_bytes']):
+            print(f"  The {self.stage} checkpoint is incomplete - starting over")
+            state = None
+
+        if state is not None:
+            with open(self.partial_path, 'r+b') as f:
+                # Drop anything written after the last commit
+                f.truncate(state['partial_bytes'])
+                f.seek(0)
+                records = [json.loads(line) for line in f]
+            stats = state.get('stats')
+            self.position = state['position']
+            print(f"  Resuming {self.stage} after {self.position} records "
+                  f"(last order_index {state.get('last_order_index')})")
+            self.partial_file = open(self.partial_path, 'ab')
+        else:
+            self.partial_file = open(self.partial_path, 'wb')
+            if self.state_path.exists():
+                self.state_path.unlink()
+
+        return records, stats
+
+    def add(self, record):
+        """Buffer one finished record; returns True when a batch is due for commit."""
+        self.pending.append(record)
+        self.position += 1
+        return len(self.pending) >= self.batch_size
+
+    def commit(self, stats, last_order_index=None):
+        """Persist buffered records, then atomically record the new position and stats."""
+        for record in self.pending:
+            self.partial_file.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self.pending = []
+        self.partial_file.flush()
+        os.fsync(self.partial_file.fileno())
+
+        write_json_atomic(self.state_path, {
+            'stage': self.stage,
+            'input_signature': self.signature,
+            'position': self.position,
+            'last_order_index': last_order_index,
+            'partial_bytes': self.partial_file.tell(),
+            'stats': stats
+        })
+
+    def finish(self):
+        """Remove the checkpoint once the stage's outputs are written."""
+        if self.partial_file is not None:
+            self.partial_file.close()
+            self.partial_file = None
+        for path in (self.state_path, self.partial_path):
+            if path.exists():
+                path.unlink()
+
+class PipelineProgress:
+    """Stages completed in the current pipeline run (temp/checkpoints/pipeline.json)."""
+
+    def __init__(self, checkpoint_dir=CHECKPOINT_DIR):
+        self.path = Path(checkpoint_dir) / 'pipeline.json'
+
+    def completed(self):
+        if not self.path.exists():
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('completed', [])
+
+    def reset(self):
+        if self.path.exists():
+            self.path.unlink()
+
+    def mark_done(self, stage):
+        completed = self.completed()
+        if stage not in completed:
+            completed.append(stage)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.path, {'completed': completed})
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the link pipeline scripts.
+
+    python scripts/designops.py [--metrics FILE] [--run-log FILE | --no-run-log] <command> [options]
+
+Each command maps to one script module, imported only when that command runs,
+so light stages such as dry-run or snippets never load BeautifulSoup, lxml or
+PyYAML. The individual scripts remain runnable on their own.
+
+Stages log one JSON line per run to temp/run_log.jsonl (see run_log.py);
+--metrics also writes Prometheus text-format metrics when the command ends.
+"""
+
+import importlib
+import sys
+
+# Command name -> (module, one-line description)
+COMMANDS = {
+    'extract': ('extract_links', "Extract all links from .source.html"),
+    'normalize': ('normalize_links', "Normalize URLs and detect duplicates"),
+    'enrich': ('enrich_links', "Fetch page metadata for normalized links (optional)"),
+    'categorize': ('categorize_links', "Categorize links using config/categories.yml"),
+    'snippets': ('generate_snippets', "Generate per-category Markdown snippets"),
+    'search': ('search_index', "Build the client-side search index for published links"),
+    'dry-run': ('dry_run_apply', "Validate snippet application without writing"),
+    'apply': ('apply_changes', "Apply snippets to index.md or mapped pages"),
+    'data': ('jekyll_data', "Write per-category Jekyll data files for include mode"),
+    'qa': ('generate_qa_report', "Generate the QA report"),
+    'shard': ('shard_pipeline', "Sharded normalize + categorize with local workers"),
+    'stream': ('stream_pipeline', "Pipelined extract + normalize + categorize with bounded queues"),
+    'run': ('pipeline', "Run pipeline stages in one process"),
+    'whatif': ('whatif', "Preview category moves for a candidate categories.yml"),
+    'store': ('link_store', "Query the cross-run link history"),
+    'watch': ('watch', "Re-run affected stages when inputs change"),
+    'benchmark': ('benchmark', "Measure cold-start import time per command"),
+    'verify': ('verify_engines', "Check optimized engines against the reference normalize/categorize"),
+}
+
+def print_usage(stream=sys.stdout):
+    """Print the list of available commands."""
+    print("usage: designops [--metrics FILE] [--run-log FILE | --no-run-log] <command> [options]\n", file=stream)
+    print("commands:", file=stream)
+    width = max(len(name) for name in COMMANDS)
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name.ljust(width)}  {description}", file=stream)
+
+def load_command(name):
+    """Import and return the module implementing a command."""
+    module_name, _ = COMMANDS[name]
+    return importlib.import_module(module_name)
+
+def main(argv=None):
+    """Dispatch to the selected command's main()."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Global monitoring options come before the command
+    run_log_path = 'temp/run_log.jsonl'
+    metrics_path = None
+    while argv and argv[0] in ('--metrics', '--run-log', '--no-run-log'):
+        option = argv[0]
+        if option == '--no-run-log':
+            run_log_path = None
+            argv = argv[1:]
+            continue
+        if len(argv) < 2:
+            print(f"designops: {option} requires a file argument", file=sys.stderr)
+            sys.exit(2)
+        if option == '--metrics':
+            metrics_path = argv[1]
+        else:
+            run_log_path = argv[1]
+        argv = argv[2:]
+
+    if not argv or argv[0] in ('-h', '--help'):
+        print_usage()
+        return
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"designops: unknown command '{command}'\n", file=sys.stderr)
+        print_usage(sys.stderr)
+        sys.exit(2)
+
+    # Let argparse in the command report itself as "designops <command>"
+    sys.argv[0] = f"designops {command}"
+
+    import run_log
+    run_log.configure(run_log_path=run_log_path, metrics_path=metrics_path)
+    try:
+        load_command(command).main(rest)
+    finally:
+        run_log.write_metrics()
+
+if __name__ == '__main__':
+    main()
@@ -2,52 +2,52 @@
 """
 Dry-run application of snippets to index.md.
 Validates structure and simulates changes without actually writing.
+
+With --pages <yaml>, every page in the page map (see page_map.py) is parsed
+concurrently and each mapped category's heading is checked on its own page.
+
+With --structured, the links to apply are read from temp/categorized.json
+instead of being parsed back out of the snippet Markdown. Either way,
+headings are looked up through the page's section index, URLs are checked
+for uniqueness with a hash set, and links that already appear on a page
+outside the sections about to be replaced are reported as duplicates.
 """
 
+import argparse
 import json
-import re
+import sys
+from collections import Counter
 from pathlib import Path
 
-# Mapping from category IDs to index.md section headings
-CATEGORY_TO_HEADING = {
-    '1.A': '### 1.A Team Models (centralised, embedded, hybrid)',
-    '1.B': '### 1.B Capacity & Resource Planning', 
-    '1.C': '### 1.C Governance & Standards',
-    '1.D': '### 1.D Onboarding & Knowledge Sharing',
-    '2.A.1': '#### 2.A.1 Foundations (colour, type, spacing)',
-    '2.A.2': '#### 2.A.2 Components (UI kits, patterns)',
-    '2.A.3': '#### 2.A.3 Documentation (usage guidelines, principles)',
-    '2.B': '### 2.B Toolchains & Platforms',
-    '2.C': '### 2.C Workflow Optimisation',
-    '2.D': '### 2.D Collaboration with Engineering',
-    '3.A': '### 3.A Testing & Accessibility',
-    '3.B': '### 3.B Metrics & Measurement',
-    '3.C': '### 3.C Feedback Loops',
-    '3.D': '### 3.D Continuous Improvement'
-}
+import run_log
+from taxonomy import load_taxonomy
 
-def parse_index_structure(index_content):
+def parse_index_structure(index_content, taxonomy=None):
     """Parse index.md and extract headings and their positions."""
+    taxonomy = taxonomy or load_taxonomy()
     lines = index_content.split('\n')
     headings = {}
     
     for i, line in enumerate(lines):
-        for category_id, expected_heading in CATEGORY_TO_HEADING.items():
-            if line.strip() == expected_heading:
-                headings[category_id] = {
-                    'line_number': i,
-                    'heading': expected_heading,
-                    'found': True
-                }
+        category_id = taxonomy.category_for_heading(line)
+        if category_id is not None:
+            headings[category_id] = {
+                'line_number': i,
+                'heading': taxonomy.headings[category_id],
+                'found': True
+            }
     
     return headings, lines
 
 def find_snippet_files():
     """Find all snippet files and their link counts."""
+    # Imported here: published_links loads the URL canonicalization rules
+    from published_links import iter_markdown_links
+    
     snippets_dir = Path('temp/snippets')
     snippets = {}
     
-    for category_id in CATEGORY_TO_HEADING.keys():
+    for category_id in load_taxonomy().ids:
         snippet_file = snippets_dir / f"{category_id}.md"
         if snippet_file.exists():
             with open(snippet_file, 'r', encoding='utf-8') as f:
@@ -58,48 +58,149 @@ def find_snippet_files():
             snippets[category_id] = {
                 'file': snippet_file,
                 'link_count': link_count,
-                'content': content
+                'urls': [url for _, url in iter_markdown_links(content)]
             }
         else:
             snippets[category_id] = {
                 'file': None,
                 'link_count': 0,
-                'content': ''
+                'urls': []
             }
     
     return snippets
 
-def dry_run_apply():
-    """Perform dry-run validation of index.md structure and snippet application."""
+def find_category_links(taxonomy=None):
+    """Collect each category's links from temp/categorized.json, in the same shape as find_snippet_files."""
+    taxonomy = taxonomy or load_taxonomy()
+    categorized_path = Path('temp/categorized.json')
+    if not categorized_path.exists():
+        print("Error: temp/categorized.json not found. Run categorize_links.py first.", file=sys.stderr)
+        return None
+    
+    with open(categorized_path, 'r', encoding='utf-8') as f:
+        categorized_links = json.load(f)
+    
+    urls = {category_id: [] for category_id in taxonomy.ids}
+    for link in categorized_links:
+        if link['action'] == 'added' and link['category'] in urls:
+            urls[link['category']].append(link['href_norm'])
+    
+    snippets_dir = Path('temp/snippets')
+    links = {}
+    for category_id in taxonomy.ids:
+        snippet_file = snippets_dir / f"{category_id}.md"
+        links[category_id] = {
+            'file': snippet_file if snippet_file.exists() else None,
+            'link_count': len(urls[category_id]),
+            'urls': urls[category_id]
+        }
+    return links
+
+def load_index_structure():
+    """Read index.md and parse its section structure, or return None if missing."""
+    index_path = Path('index.md')
+    if not index_path.exists():
+        print("Error: index.md not found", file=sys.stderr)
+        return None
+    
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index_content = f.read()
+    
+    return parse_index_structure(index_content)
+
+def load_page_lines(page):
+    """Read one page's lines, or return None if the page is missing."""
+    if not page.exists():
+        return None
+    with open(page, 'r', encoding='utf-8') as f:
+        return f.read().split('\n')
+
+def urls_outside_sections(lines, sections, replaced_categories):
+    """Return the normalized URLs linked on a page outside the sections that will be replaced."""
+    from published_links import scan_published_urls
+    
+    kept_lines = []
+    position = 0
+    for heading_line, end in sorted(sections[category_id] for category_id in replaced_categories):
+        kept_lines.extend(lines[position:heading_line + 1])
+        position = end
+    kept_lines.extend(lines[position:])
+    return scan_published_urls('\n'.join(kept_lines))
+
+@run_log.instrument('dry_run')
+def dry_run_apply(index_structure=None, pages_path=None, workers=None, structured=False):
+    """Perform dry-run validation of index.md structure and snippet application.
+    
+    index_structure, when given, is a (headings, lines) pair from
+    parse_index_structure and is used instead of re-reading index.md.
+    pages_path, when given, is a page map YAML; every page in it is validated.
+    structured validates the categorized records instead of the snippet files.
+    """
+    # Imported here so a cold start of the dry-run does not pay for the page map machinery
+    from page_map import DEFAULT_PAGE, load_page_map, map_pages, section_index
+    
     try:
-        # Read current index.md
-        index_path = Path('index.md')
-        if not index_path.exists():
-            print("Error: index.md not found", file=sys.stderr)
-            return False
-            
-        with open(index_path, 'r', encoding='utf-8') as f:
-            index_content = f.read()
+        taxonomy = load_taxonomy()
+        
+        # Read and parse the current page(s)
+        if pages_path is None:
+            if index_structure is None:
+                index_structure = load_index_structure()
+                if index_structure is None:
+                    return False
+            page_map = {Path(DEFAULT_PAGE): taxonomy.ids}
+            page_lines = {Path(DEFAULT_PAGE): index_structure[1]}
+        else:
+            page_map = load_page_map(pages_path, taxonomy)
+            page_lines = dict(zip(page_map, map_pages(load_page_lines, page_map, workers)))
+        
+        # Category ID -> (heading line, end line) of every section on each page
+        page_headings = {
+            page: section_index(lines, taxonomy) if lines is not None else None
+            for page, lines in page_lines.items()
+        }
         
-        print("Performing dry-run validation...")
+        print("Performing dry-run validation" + (" from categorized records..." if structured else "..."))
         
-        # Parse structure
-        headings, lines = parse_index_structure(index_content)
-        snippets = find_snippet_files()
+        snippets = find_category_links(taxonomy) if structured else find_snippet_files()
+        if snippets is None:
+            return False
         
         # Validation results
         validation_errors = []
         validation_warnings = []
         
-        # Check all expected headings exist
+        missing_pages = [str(page) for page, found in page_headings.items() if found is None]
+        if missing_pages:
+            validation_errors.append(f"Missing pages: {missing_pages}")
+        
+        # Check every mapped category's heading exists on its page
+        headings = {}
         missing_headings = []
-        for category_id, expected_heading in CATEGORY_TO_HEADING.items():
-            if category_id not in headings:
-                missing_headings.append(f"{category_id}: {expected_heading}")
+        expected_headings = 0
+        for page, category_ids in page_map.items():
+            found = page_headings[page] or {}
+            for category_id in category_ids:
+                expected_headings += 1
+                if category_id in found:
+                    headings.setdefault(category_id, []).append(str(page))
+                elif pages_path is None:
+                    missing_headings.append(f"{category_id}: {taxonomy.headings[category_id]}")
+                else:
+                    missing_headings.append(f"{category_id} in {page}: {taxonomy.headings[category_id]}")
         
         if missing_headings:
             validation_errors.append(f"Missing headings: {missing_headings}")
         
+        # Links in categories no page holds would never be published
+        unmapped = [
+            category_id for category_id in taxonomy.ids
+            if snippets[category_id]['link_count'] > 0
+            and not any(category_id in category_ids for category_ids in page_map.values())
+        ]
+        if unmapped:
+            validation_warnings.append(f"Categories with links not mapped to any page: {unmapped}")
+        
         # Verify no extra headings would be created
         # (This is inherently prevented by our approach)
         
@@ -117,15 +218,23 @@ def dry_run_apply():
         duplicate_links = []
         
         for category_id, snippet_data in snippets.items():
-            if snippet_data['content']:
-                # Extract URLs from markdown links
-                link_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-                matches = re.findall(link_pattern, snippet_data['content'])
-                
-                for text, url in matches:
-                    if url in simulated_links:
-                        duplicate_links.append(f"Duplicate URL {url} in category {category_id}")
-                    simulated_links.add(url)
+            for url in snippet_data['urls']:
+                if url in simulated_links:
+                    duplicate_links.append(f"Duplicate URL {url} in category {category_id}")
+                simulated_links.add(url)
+        
+        # Links kept on a page (outside the replaced sections) must not be added again
+        for page, category_ids in page_map.items():
+            sections = page_headings[page]
+            if sections is None:
+                continue
+            replaced = [category_id for category_id in category_ids
+                        if category_id in sections and snippets[category_id]['link_count'] > 0]
+            kept_urls = urls_outside_sections(page_lines[page], sections, replaced)
+            for category_id in replaced:
+                for url in snippets[category_id]['urls']:
+                    if url in kept_urls:
+                        duplicate_links.append(f"URL {url} in category {category_id} is already on {page}")
         
         if duplicate_links:
             validation_errors.append(f"Would introduce duplicates: {duplicate_links[:5]}...")  # Show first 5
@@ -133,27 +242,62 @@ def dry_run_apply():
         # Generate report
         report = {
             'validation_passed': len(validation_errors) == 0,
-            'total_headings_found': len(headings),
-            'total_expected_headings': len(CATEGORY_TO_HEADING),
+            'total_headings_found': sum(len(pages) for pages in headings.values()),
+            'total_expected_headings': expected_headings,
             'total_categories_with_links': sum(1 for s in snippets.values() if s['link_count'] > 0),
             'total_links_to_add': sum(s['link_count'] for s in snippets.values()),
             'unique_links': len(simulated_links),
+            'source': 'categorized' if structured else 'snippets',
             'categories': {},
             'validation_errors': validation_errors,
             'validation_warnings': validation_warnings
         }
         
+        if pages_path is not None:
+            report['pages'] = {
+                str(page): {
+                    'found': page_headings[page] is not None,
+                    'categories': list(category_ids),
+                    'headings_found': sum(1 for category_id in category_ids if category_id in (page_headings[page] or {}))
+                }
+                for page, category_ids in page_map.items()
+            }
+        
+        # Changes since the previous run, read from the link store
+        # (imported here so validation-only startup does not load sqlite3)
+        import link_store
+        delta = link_store.load_delta()
+        added_by_category = Counter()
+        removed_by_category = Counter()
+        if delta is not None:
+            added_by_category.update(link['category'] for link in delta['added'])
+            removed_by_category.update(link['category'] for link in delta['removed'])
+            for move in delta['moved']:
+                added_by_category[move['to_category']] += 1
+                removed_by_category[move['from_category']] += 1
+            report['delta'] = {
+                'since_run': delta['since_run'],
+                'current_run': delta['to_run'],
+                'links_added': delta['links_added'],
+                'links_removed': delta['links_removed'],
+                'category_changes': delta['category_changes']
+            }
+        
         # Per-category details
-        for category_id in CATEGORY_TO_HEADING.keys():
+        for category_id in taxonomy.ids:
             heading_found = category_id in headings
             snippet_data = snippets.get(category_id, {'link_count': 0})
             
             report['categories'][category_id] = {
                 'heading_found': heading_found,
-                'heading_text': CATEGORY_TO_HEADING[category_id],
+                'pages': headings.get(category_id, []),
+                'heading_text': taxonomy.headings[category_id],
                 'link_count': snippet_data['link_count'],
                 'will_be_updated': heading_found and snippet_data['link_count'] > 0
             }
+            if delta is not None:
+                report['categories'][category_id]['links_added_since_previous_run'] = added_by_category[category_id]
+                report['categories'][category_id]['links_removed_since_previous_run'] = removed_by_category[category_id]
         
         # Write report
         report_path = Path('temp/dry_run_report.json')
@@ -173,21 +317,39 @@ def dry_run_apply():
                 print(f"  WARNING: {warning}")
         
         print(f"\nDry-run summary:")
-        print(f"  - Headings found: {len(headings)}/{len(CATEGORY_TO_HEADING)}")
+        if pages_path is not None:
+            print(f"  - Pages checked: {len(page_map)}")
+        print(f"  - Headings found: {report['total_headings_found']}/{expected_headings}")
         print(f"  - Categories with links: {report['total_categories_with_links']}")
         print(f"  - Total links to add: {report['total_links_to_add']}")
         print(f"  - Unique URLs: {report['unique_links']}")
+        if delta is not None:
+            print(f"  - Since run {delta['since_run']}: +{delta['links_added']} / -{delta['links_removed']} links, "
+                  f"{delta['category_changes']} category changes")
         print(f"  - Report written to: {report_path}")
         
         return report['validation_passed']
-        
+    
     except Exception as e:
+        run_log.record_error(e)
         print(f"Fatal error during dry-run: {e}")
         return False
 
-if __name__ == '__main__':
-    import sys
-    success = dry_run_apply()
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Validate snippet application to index.md without writing")
+    parser.add_argument('--pages', metavar='YAML',
+                        help="page map of Markdown pages to the categories they hold (default: index.md only)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="pages parsed concurrently (default: up to 8)")
+    parser.add_argument('--structured', action='store_true',
+                        help="validate the links in temp/categorized.json instead of parsing the snippet files")
+    args = parser.parse_args(argv)
+    
+    success = dry_run_apply(pages_path=args.pages, workers=args.workers, structured=args.structured)
     if not success:
         sys.exit(1)
     print("Dry-run validation completed successfully")
+
+if __name__ == '__main__':
+    main()
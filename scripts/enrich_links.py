@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Optional enrichment stage: fetch page metadata for links with weak anchor text.
+Takes temp/links_normalized.json, fetches each unique valid URL's <title>,
+og:title and meta description, and stores them on the records as `meta_text`.
+categorize_links.py falls back to `meta_text` when the URL and anchor text
+match no category.
+
+Fetching uses asyncio + aiohttp with a pooled connector and a concurrency
+cap; one event loop and one client session serve the whole stage. Responses
+are streamed and reading stops once </head> has been seen.
+Results (including failures) are cached in temp/enrichment_cache.json so
+re-runs only fetch new URLs. URLs are fetched in batches that are
+checkpointed (see checkpoint.py), so --resume continues an interrupted run
+without refetching the batches already done.
+
+Run between normalize_links.py and categorize_links.py.
+"""
+
+import argparse
+import json
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+import run_log
+from checkpoint import DEFAULT_BATCH_SIZE, Checkpoint
+
+CACHE_PATH = Path('temp/enrichment_cache.json')
+NORMALIZED_PATH = Path('temp/links_normalized.json')
+
+USER_AGENT = 'awesomeDesignOps-link-enricher/1.0'
+HEAD_END_OVERLAP = len(b'</head>') - 1
+
+class HeadMetadataParser(HTMLParser):
+    """Collect <title>, og:title and meta description from an HTML head."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.og_title = ''
+        self.description = ''
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._in_title = True
+        elif tag == 'meta':
+            attrs = {key.lower(): (value or '') for key, value in attrs}
+            name = (attrs.get('property') or attrs.get('name') or '').lower()
+            if name == 'og:title' and not self.og_title:
+                self.og_title = attrs.get('content', '').strip()
+            elif name in ('description', 'og:description') and not self.description:
+                self.description = attrs.get('content', '').strip()
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+def parse_head_metadata(head_html):
+    """Extract title, og:title and description from (partial) HTML."""
+    parser = HeadMetadataParser()
+    try:
+        parser.feed(head_html)
+        parser.close()
+    except Exception:
+        # Truncated or malformed markup - keep whatever was parsed
+        pass
+    return {
+        'title': ' '.join(parser.title.split()),
+        'og_title': ' '.join(parser.og_title.split()),
+        'description': ' '.join(parser.description.split())
+    }
+
+def build_meta_text(metadata):
+    """Join the distinct non-empty metadata fields into one string."""
+    parts = []
+    for key in ('title', 'og_title', 'description'):
+        value = metadata.get(key)
+        if value and value not in parts:
+            parts.append(value)
+    return ' '.join(parts)
+
+async def fetch_metadata(session, url, max_head_bytes):
+    """Fetch one URL, reading only until </head>, and return its metadata."""
+    try:
+        async with session.get(url) as response:
+            content_type = response.headers.get('Content-Type', '')
+            if response.status >= 400:
+                return {'error': f"http_{response.status}"}
+            if 'html' not in content_type.lower():
+                return {'error': f"not_html:{content_type.split(';')[0].strip()}"}
+
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(8192):
+                # Only the new chunk (plus an overlap for a split tag) can hold </head>
+                window = bytes(buffer[-HEAD_END_OVERLAP:]) + chunk
+                buffer.extend(chunk)
+                if b'</head>' in window.lower() or len(buffer) >= max_head_bytes:
+                    break
+
+            head_html = bytes(buffer).decode(response.charset or 'utf-8', errors='replace')
+            return parse_head_metadata(head_html)
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"[:200]}
+
+async def fetch_batch(session, semaphore, urls, max_head_bytes):
+    """Fetch metadata for one batch of URLs over an open session."""
+    import asyncio
+
+    results = {}
+
+    async def worker(url):
+        async with semaphore:
+            metadata = await fetch_metadata(session, url, max_head_bytes)
+        metadata['fetched_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        results[url] = metadata
+
+    await asyncio.gather(*(worker(url) for url in urls))
+    return results
+
+async def fetch_all(urls, concurrency=20, per_host=4, timeout=15, max_head_bytes=256 * 1024,
+                    batch_size=None, on_batch=None):
+    """Fetch metadata for many URLs with one shared session and connection pool.
+
+    URLs are fetched batch_size at a time (all at once by default) and
+    on_batch(batch, results) is called after each batch, e.g. to checkpoint.
+    """
+    import asyncio
+
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    results = {}
+    step = batch_size or max(len(urls), 1)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        for batch_start in range(0, len(urls), step):
+            batch = urls[batch_start:batch_start + step]
+            batch_results = await fetch_batch(session, semaphore, batch, max_head_bytes)
+            results.update(batch_results)
+            if on_batch is not None:
+                on_batch(batch, batch_results)
+
+    return results
+
+def load_cache(path=CACHE_PATH):
+    """Load the metadata cache, or an empty one."""
+    if not Path(path).exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_cache(cache, path=CACHE_PATH):
+    """Write the metadata cache."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, ensure_ascii=False)
+
+@run_log.instrument('enrich')
+def enrich_links(concurrency=20, per_host=4, timeout=15, retry_errors=False, resume=False,
+                 batch_size=DEFAULT_BATCH_SIZE):
+    """Fetch metadata for all unique valid URLs and annotate the normalized links."""
+    import asyncio
+
+    try:
+        if not NORMALIZED_PATH.exists():
+            print("Error: temp/links_normalized.json not found. Run normalize_links.py first.", file=sys.stderr)
+            sys.exit(1)
+
+        with open(NORMALIZED_PATH, 'r', encoding='utf-8') as f:
+            links = json.load(f)
+
+        cache = load_cache()
+        urls = list(dict.fromkeys(link['href_norm'] for link in links if link['valid_url']))
+        to_fetch = [
+            url for url in urls
+            if url not in cache or (retry_errors and 'error' in cache[url])
+        ]
+
+        run_log.record_cache('metadata', len(urls) - len(to_fetch), len(urls))
+        print(f"Enriching {len(urls)} unique URLs ({len(urls) - len(to_fetch)} cached, {len(to_fetch)} to fetch)")
+
+        if to_fetch:
+            start = time.perf_counter()
+            checkpoint = Checkpoint('enrich', [NORMALIZED_PATH, CACHE_PATH], batch_size)
+            done, _ = checkpoint.start(resume)
+            to_fetch_set = set(to_fetch)
+            fetched = {url: metadata for url, metadata in done if url in to_fetch_set}
+            remaining = [url for url in to_fetch if url not in fetched]
+
+            def commit_batch(batch, results):
+                for url in batch:
+                    fetched[url] = results[url]
+                    checkpoint.add([url, results[url]])
+                checkpoint.commit({'fetched': len(fetched)})
+
+            asyncio.run(fetch_all(remaining, concurrency=concurrency, per_host=per_host, timeout=timeout,
+                                  batch_size=batch_size, on_batch=commit_batch))
+
+            cache.update(fetched)
+            save_cache(cache)
+            checkpoint.finish()
+            errors = sum(1 for metadata in fetched.values() if 'error' in metadata)
+            run_log.record_counts({'fetch_errors': errors})
+            print(f"  - Fetched {len(fetched)} URLs in {time.perf_counter() - start:.1f}s ({errors} errors)")
+
+        enriched = 0
+        for link in links:
+            metadata = cache.get(link['href_norm']) if link['valid_url'] else None
+            meta_text = build_meta_text(metadata) if metadata and 'error' not in metadata else ''
+            link['meta_text'] = meta_text
+            if meta_text:
+                enriched += 1
+
+        with open(NORMALIZED_PATH, 'w', encoding='utf-8') as f:
+            json.dump(links, f, indent=2, ensure_ascii=False)
+
+        print(f"  - Links with metadata: {enriched}/{len(links)}")
+        print(f"Wrote enriched links to {NORMALIZED_PATH}")
+
+        return {
+            'unique_urls': len(urls),
+            'fetched': len(to_fetch),
+            'enriched_links': enriched
+        }
+
+    except Exception as e:
+        run_log.record_error(e)
+        print(f"Fatal error during enrichment: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Fetch page titles/descriptions for normalized links")
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help="maximum concurrent requests (default: 20)")
+    parser.add_argument('--per-host', type=int, default=4,
+                        help="maximum concurrent connections per host (default: 4)")
+    parser.add_argument('--timeout', type=float, default=15,
+                        help="per-request timeout in seconds (default: 15)")
+    parser.add_argument('--retry-errors', action='store_true',
+                        help="re-fetch URLs whose cached result is an error")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue from the last checkpoint of an interrupted run")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"URLs fetched per checkpoint batch (default: {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args(argv)
+
+    stats = enrich_links(concurrency=args.concurrency, per_host=args.per_host,
+                         timeout=args.timeout, retry_errors=args.retry_errors,
+                         resume=args.resume, batch_size=args.checkpoint_every)
+    print(f"Successfully enriched {stats['enriched_links']} links")
+
+if __name__ == '__main__':
+    main()
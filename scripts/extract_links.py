@@ -4,59 +4,69 @@ Extract all links from .source.html file.
 Outputs raw link data to temp/links_raw.json and temp/links_raw.csv
 """
 
+import argparse
 import json
 import csv
 import sys
 from pathlib import Path
-from bs4 import BeautifulSoup
 import html
 import uuid
 
+import run_log
+
+def iter_links(html_content):
+    """Yield link records for every anchor with an href, in document order."""
+    # Imported lazily so the CLI does not pay for BeautifulSoup/lxml unless extracting
+    from bs4 import BeautifulSoup
+    
+    # Parse with BeautifulSoup
+    soup = BeautifulSoup(html_content, 'lxml')
+    
+    current_section = "Unknown"
+    order_index = 0
+    
+    # Walk through all elements to track sections and extract links
+    for element in soup.find_all(['h2', 'h3', 'a']):
+        if element.name in ['h2', 'h3']:
+            # Update current section context
+            current_section = element.get_text(strip=True)
+        elif element.name == 'a':
+            href = element.get('href')
+            if href:  # Only process anchors with href
+                # Generate unique ID for this link
+                link_id = str(uuid.uuid4())
+                
+                # Extract and clean text
+                text = element.get_text(strip=True)
+                # Decode HTML entities
+                text = html.unescape(text)
+                
+                yield {
+                    'id': link_id,
+                    'href_raw': href,
+                    'text_raw': text,
+                    'section_hint': current_section,
+                    'order_index': order_index
+                }
+                order_index += 1
+
+def read_source(source_path=Path('.source.html')):
+    """Read the source HTML, exiting if it is missing."""
+    if not source_path.exists():
+        print(f"Error: {source_path} not found", file=sys.stderr)
+        sys.exit(1)
+        
+    with open(source_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+@run_log.instrument('extract', result_name='links')
 def extract_links():
     """Extract all anchor tags from .source.html with metadata."""
     try:
         # Read the source HTML file
-        source_path = Path('.source.html')
-        if not source_path.exists():
-            print(f"Error: {source_path} not found", file=sys.stderr)
-            sys.exit(1)
-            
-        with open(source_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        html_content = read_source()
         
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'lxml')
-        
-        links = []
-        current_section = "Unknown"
-        order_index = 0
-        
-        # Walk through all elements to track sections and extract links
-        for element in soup.find_all(['h2', 'h3', 'a']):
-            if element.name in ['h2', 'h3']:
-                # Update current section context
-                current_section = element.get_text(strip=True)
-            elif element.name == 'a':
-                href = element.get('href')
-                if href:  # Only process anchors with href
-                    # Generate unique ID for this link
-                    link_id = str(uuid.uuid4())
-                    
-                    # Extract and clean text
-                    text = element.get_text(strip=True)
-                    # Decode HTML entities
-                    text = html.unescape(text)
-                    
-                    link_data = {
-                        'id': link_id,
-                        'href_raw': href,
-                        'text_raw': text,
-                        'section_hint': current_section,
-                        'order_index': order_index
-                    }
-                    
-                    links.append(link_data)
-                    order_index += 1
+        links = list(iter_links(html_content))
         
         print(f"Extracted {len(links)} links from .source.html")
         
@@ -83,9 +93,17 @@ def extract_links():
         return len(links)
         
     except Exception as e:
+        run_log.record_error(e)
         print(f"Fatal error during link extraction: {e}", file=sys.stderr)
         sys.exit(1)
 
-if __name__ == '__main__':
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Extract all links from .source.html")
+    parser.parse_args(argv)
+    
     total_links = extract_links()
     print(f"Successfully extracted {total_links} links")
+
+if __name__ == '__main__':
+    main()
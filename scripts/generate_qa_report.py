@@ -4,11 +4,16 @@ Generate comprehensive QA report for the link categorization process.
 Validates all acceptance criteria and produces detailed audit trail.
 """
 
+import argparse
 import json
 import csv
 from pathlib import Path
 from collections import defaultdict, Counter
 
+import link_store
+import run_log
+from taxonomy import load_taxonomy
+
 def load_data():
     """Load all data files for QA analysis."""
     data = {}
@@ -35,6 +40,7 @@ def load_data():
     
     return data
 
+@run_log.instrument('qa')
 def generate_qa_report():
     """Generate comprehensive QA report."""
     try:
@@ -44,7 +50,9 @@ def generate_qa_report():
         raw_links = data['raw_links']
         normalized_links = data['normalized_links']
         categorized_links = data['categorized_links']
-        duplicates = data['duplicates']
+        # Fuzzy text matches (match_type "text") are reported separately
+        duplicates = [dup for dup in data['duplicates'] if dup.get('match_type', 'url') == 'url']
+        text_duplicates = [dup for dup in data['duplicates'] if dup.get('match_type', 'url') == 'text']
         
         # High-level statistics
         total_extracted = len(raw_links)
@@ -129,10 +137,26 @@ def generate_qa_report():
             'duplicates_info': {
                 'duplicate_url_groups': len(duplicates),
                 'total_duplicate_links': sum(int(dup['duplicate_count']) - 1 for dup in duplicates),
-                'duplicate_details': duplicates
+                'duplicate_details': duplicates,
+                'text_duplicate_groups': len(text_duplicates),
+                'text_duplicate_details': text_duplicates
             }
         }
         
+        # Changes since the previous run, read from the link store
+        delta = link_store.load_delta()
+        if delta is not None:
+            report['history'] = {
+                'since_run': delta['since_run'],
+                'current_run': delta['to_run'],
+                'links_added': delta['links_added'],
+                'links_removed': delta['links_removed'],
+                'category_changes': delta['category_changes'],
+                'added': delta['added'],
+                'removed': delta['removed'],
+                'moved': delta['moved']
+            }
+        
         # Per-category details
         for category_id, count in category_counts.items():
             report['categories'][category_id] = {
@@ -141,11 +165,8 @@ def generate_qa_report():
             }
         
         # Add empty categories
-        all_expected_categories = [
-            '1.A', '1.B', '1.C', '1.D',
-            '2.A.1', '2.A.2', '2.A.3', '2.B', '2.C', '2.D',
-            '3.A', '3.B', '3.C', '3.D'
-        ]
+        taxonomy = load_taxonomy()
+        all_expected_categories = taxonomy.ids
         
         for category_id in all_expected_categories:
             if category_id not in report['categories']:
@@ -167,7 +188,7 @@ def generate_qa_report():
             'no_duplicate_urls': len(cross_category_duplicates) == 0,
             'backups_exist': Path('temp').exists() and any(Path('temp').glob('*.bak')),
             'valid_categories_only': all(
-                link['category'] in all_expected_categories
+                link['category'] in taxonomy
                 for link in categorized_links if link['action'] == 'added'
             )
         }
@@ -192,13 +213,16 @@ def generate_qa_report():
         print(f"  - Links processed: {total_extracted} (100%)")
         print(f"  - Links added: {total_added}")
         print(f"  - Links skipped: {total_skipped}")
-        print(f"  - Categories populated: {len([c for c in report['categories'].values() if c['link_count'] > 0])}/14")
+        print(f"  - Categories populated: {len([c for c in report['categories'].values() if c['link_count'] > 0])}/{len(taxonomy)}")
         print(f"  - JSON report: {json_path}")
         print(f"  - Markdown report: {md_path}")
         
+        run_log.record_counts(report['summary'])
+        
         return report
         
     except Exception as e:
+        run_log.record_error(e)
         print(f"Fatal error generating QA report: {e}")
         return None
 
@@ -236,6 +260,17 @@ def generate_markdown_report(report):
     
     md.append("\n")
     
+    # Changes since previous run
+    if report.get('history'):
+        h = report['history']
+        md.append(f"## Changes Since Run {h['since_run']}\n")
+        md.append(f"- **Links added**: {h['links_added']}")
+        md.append(f"- **Links removed**: {h['links_removed']}")
+        md.append(f"- **Category changes**: {h['category_changes']}")
+        for move in h['moved']:
+            md.append(f"  - {move['from_category']} → {move['to_category']}: {move['href_norm']}")
+        md.append("\n")
+    
     # Skip Reasons
     if report['skip_breakdown']:
         md.append("## Links Skipped\n")
@@ -245,7 +280,11 @@ def generate_markdown_report(report):
     
     return '\n'.join(md)
 
-if __name__ == '__main__':
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Generate the QA report for the categorization run")
+    parser.parse_args(argv)
+    
     report = generate_qa_report()
     if report and report['overall_pass']:
         print("\n🎉 All acceptance criteria passed!")
@@ -253,3 +292,6 @@ if __name__ == '__main__':
         print("\n⚠️ Some acceptance criteria failed - see report for details")
     else:
         print("\n❌ Failed to generate QA report")
+
+if __name__ == '__main__':
+    main()
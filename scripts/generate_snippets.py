@@ -2,14 +2,79 @@
 """
 Generate per-category Markdown snippets from categorized links.
 Takes temp/categorized.json and creates temp/snippets/{category}.md files
+
+Snippets are only rewritten when their content hash changes, so untouched
+files keep their mtime, and snippets of categories left without links are
+deleted. The categories that changed are recorded in
+temp/snippets_manifest.json for apply_changes.py --changed-only; they
+accumulate over runs until apply_changes.py has applied them, so running
+this script twice before applying does not lose a change.
 """
 
+import argparse
+import hashlib
 import json
 import sys
 from pathlib import Path
 from collections import defaultdict
 
-def generate_snippets():
+import run_log
+from taxonomy import load_taxonomy
+
+MANIFEST_PATH = Path('temp/snippets_manifest.json')
+# Section content for a category whose links are all gone
+EMPTY_SECTION = '<!-- Content TBC -->'
+
+def render_snippet(category_id, links_list):
+    """Render one category's links as Markdown and return (category_id, content)."""
+    # Sort links alphabetically by text for consistency
+    links_list = sorted(links_list, key=lambda x: x['text'].lower())
+    
+    # Format as [text](url) - no descriptions
+    markdown_lines = [f"- [{link['text']}]({link['url']})" for link in links_list]
+    
+    return category_id, '\n'.join(markdown_lines) + '\n'
+
+def content_hash(content):
+    """Return the sha256 hex digest of snippet content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def file_hash(path):
+    """Return the sha256 hex digest of an existing file, or None if missing."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def load_manifest():
+    """Load the snippet manifest, or None if there is none."""
+    if not MANIFEST_PATH.exists():
+        return None
+    with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    """Write the snippet manifest."""
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+def render_all(categories, jobs=1):
+    """Render every category, in parallel worker processes when jobs > 1."""
+    items = [(category_id, links_list) for category_id, links_list in categories.items() if links_list]
+    
+    if jobs <= 1 or len(items) <= 1:
+        return dict(render_snippet(category_id, links_list) for category_id, links_list in items)
+    
+    # Imported lazily; the process pool machinery is only needed for --jobs > 1
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        rendered = executor.map(render_snippet, *zip(*items))
+        return dict(rendered)
+
+@run_log.instrument('snippets')
+def generate_snippets(jobs=1):
     """Generate markdown snippets for each category."""
     try:
         # Load categorized links
@@ -37,40 +102,62 @@ def generate_snippets():
         snippets_dir = Path('temp/snippets')
         snippets_dir.mkdir(exist_ok=True)
         
-        # Generate a snippet for each category
+        rendered = render_all(categories, jobs=jobs)
+        
+        # Write only the snippets whose content hash differs from the file on disk
         total_links = 0
+        changed_categories = []
+        hashes = {}
         
-        for category_id, links_list in categories.items():
-            if not links_list:
-                continue
-                
-            # Sort links alphabetically by text for consistency
-            links_list.sort(key=lambda x: x['text'].lower())
-            
-            # Generate markdown content
-            markdown_lines = []
-            for link in links_list:
-                # Format as [text](url) - no descriptions
-                markdown_lines.append(f"- [{link['text']}]({link['url']})")
-            
-            markdown_content = '\n'.join(markdown_lines) + '\n'
-            
-            # Write to category file
+        for category_id in sorted(rendered):
+            markdown_content = rendered[category_id]
             category_file = snippets_dir / f"{category_id}.md"
-            with open(category_file, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            new_hash = content_hash(markdown_content)
+            hashes[category_id] = new_hash
             
-            print(f"  - {category_id}: {len(links_list)} links -> {category_file}")
-            total_links += len(links_list)
+            if file_hash(category_file) != new_hash:
+                with open(category_file, 'w', encoding='utf-8') as f:
+                    f.write(markdown_content)
+                changed_categories.append(category_id)
+                status = "updated"
+            else:
+                status = "unchanged"
+            
+            link_count = len(categories[category_id])
+            print(f"  - {category_id}: {link_count} links -> {category_file} ({status})")
+            total_links += link_count
+        
+        # A category without links must not keep its old snippet
+        removed_categories = []
+        for stale in sorted(snippets_dir.glob('*.md')):
+            if stale.stem not in rendered:
+                stale.unlink()
+                removed_categories.append(stale.stem)
+                print(f"  - {stale.stem}: no links -> removed {stale}")
         
-        print(f"\nGenerated {len(categories)} snippet files with {total_links} total links")
+        print(f"\nGenerated {len(rendered)} snippet files with {total_links} total links")
+        if changed_categories or removed_categories:
+            print(f"Changed categories: {', '.join(changed_categories + removed_categories)}")
+        else:
+            print("No snippet content changed")
+        
+        # Record which categories changed so apply_changes can limit itself to them.
+        # Changes not yet applied stay pending until apply_changes consumes them.
+        previous = load_manifest() or {}
+        removed = (set(previous.get('removed_categories', [])) - set(rendered)) | set(removed_categories)
+        pending = set(previous.get('changed_categories', [])) | set(changed_categories) | removed
+        manifest = {
+            'changed_categories': sorted(pending),
+            'removed_categories': sorted(removed),
+            'hashes': hashes
+        }
+        save_manifest(manifest)
+        carried = sorted(pending - set(changed_categories) - set(removed_categories))
+        if carried:
+            print(f"Not yet applied from earlier runs: {', '.join(carried)}")
         
         # Verify all expected categories have files
-        expected_categories = [
-            '1.A', '1.B', '1.C', '1.D',
-            '2.A.1', '2.A.2', '2.A.3', '2.B', '2.C', '2.D',
-            '3.A', '3.B', '3.C', '3.D'
-        ]
+        expected_categories = load_taxonomy().ids
         
         missing_categories = []
         for expected in expected_categories:
@@ -83,14 +170,27 @@ def generate_snippets():
         return {
             'categories_with_links': len(categories),
             'total_links': total_links,
-            'missing_categories': missing_categories
+            'missing_categories': missing_categories,
+            'changed_categories': changed_categories + removed_categories,
+            'pending_categories': sorted(pending)
         }
         
     except Exception as e:
+        run_log.record_error(e)
         print(f"Fatal error generating snippets: {e}", file=sys.stderr)
         sys.exit(1)
 
-if __name__ == '__main__':
-    stats = generate_snippets()
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Generate per-category Markdown snippets")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="render categories in this many worker processes (default: 1)")
+    args = parser.parse_args(argv)
+    
+    stats = generate_snippets(jobs=args.jobs)
     print(f"\nSuccessfully generated {stats['categories_with_links']} snippet files")
     print(f"Total links: {stats['total_links']}")
+    print(f"Changed: {len(stats['changed_categories'])}")
+
+if __name__ == '__main__':
+    main()
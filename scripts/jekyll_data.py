@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Write categorized links as Jekyll data files.
+
+Instead of splicing every link into index.md as Markdown, each category's
+links go to _data/links/<key>.json and the page holds a single
+
+    {% include link_list.html category="1-A" %}
+
+under the category heading (see apply_changes.py --mode include). Jekyll
+renders the list from site.data.links at build time through
+_includes/link_list.html, so the page itself only changes when a section
+gains or loses its include, and a new link touches one small data file.
+
+Jekyll keys data files by their sanitized basename, which drops dots
+("1.A.json" would become site.data.links["1A"]), so files are named by
+data_key(): the category ID with dots replaced by hyphens.
+
+Data files are rewritten only when their content hash changes, and files
+of categories that no longer have links are removed, so unchanged
+categories keep their mtime for Jekyll's incremental build and diffs stay
+limited to the categories that changed.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import run_log
+from generate_snippets import EMPTY_SECTION, content_hash, file_hash
+from taxonomy import load_taxonomy
+
+DATA_DIR = Path('_data/links')
+INCLUDE_PATH = Path('_includes/link_list.html')
+
+INCLUDE_TEMPLATE = """\
+{%- comment -%}
+  Links of one category, from _data/links/<key>.json.
+  Generated by scripts/jekyll_data.py; pass the data key ("1-A" for 1.A) as include.category.
+{%- endcomment -%}
+<ul>
+{%- for link in site.data.links[include.category] %}
+  <li><a href="{{ link.url | escape }}">{{ link.text | escape }}</a></li>
+{%- endfor %}
+</ul>
+"""
+
+def jekyll_key(basename):
+    """Return the site.data key Jekyll's DataReader derives from a file basename."""
+    return re.sub(r'\s+', '_', re.sub(r'[^\w\s-]+', '', basename).strip())
+
+def data_key(category_id):
+    """Return the data file basename (and site.data.links key) of a category."""
+    key = category_id.replace('.', '-')
+    if jekyll_key(key) != key:
+        raise ValueError(f"Category ID {category_id!r} has no stable Jekyll data key")
+    return key
+
+def include_tag(category_id):
+    """Return the Liquid include that renders one category's links."""
+    return f'{{% include {INCLUDE_PATH.name} category="{data_key(category_id)}" %}}'
+
+def group_links(categorized_links):
+    """Group added links by category as {'text', 'url'} records, sorted like the snippets."""
+    categories = defaultdict(list)
+    for link in categorized_links:
+        if link['action'] == 'added' and link['category']:
+            categories[link['category']].append({
+                'text': link['text_final'],
+                'url': link['href_norm']
+            })
+    return {
+        category_id: sorted(links, key=lambda link: link['text'].lower())
+        for category_id, links in categories.items()
+    }
+
+def render_data(links):
+    """Render one category's data file."""
+    return json.dumps(links, indent=2, ensure_ascii=False) + '\n'
+
+def write_if_changed(path, content):
+    """Write content to path unless the file already holds it; return True if written."""
+    if file_hash(path) == content_hash(content):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+@run_log.instrument('data')
+def write_link_data(data_dir=DATA_DIR, include_path=INCLUDE_PATH):
+    """Write _data/links/<key>.json from temp/categorized.json.
+
+    Returns stats including 'link_counts' ({category: links}) for the
+    categories that have data files.
+    """
+    try:
+        categorized_path = Path('temp/categorized.json')
+        if not categorized_path.exists():
+            print("Error: temp/categorized.json not found. Run categorize_links.py first.", file=sys.stderr)
+            sys.exit(1)
+
+        with open(categorized_path, 'r', encoding='utf-8') as f:
+            categories = group_links(json.load(f))
+
+        data_dir = Path(data_dir)
+        keys = {data_key(category_id): category_id for category_id in categories}
+        written = []
+        for category_id in sorted(categories):
+            if write_if_changed(data_dir / f"{data_key(category_id)}.json", render_data(categories[category_id])):
+                written.append(category_id)
+
+        # A category that lost all its links must not keep publishing the old ones
+        # (apply_changes.py replaces its include with EMPTY_SECTION)
+        removed = []
+        if data_dir.exists():
+            category_ids = {data_key(category_id): category_id for category_id in load_taxonomy().ids}
+            for stale in sorted(data_dir.glob('*.json')):
+                if stale.stem not in keys:
+                    stale.unlink()
+                    removed.append(category_ids.get(stale.stem, stale.stem))
+
+        include_written = write_if_changed(Path(include_path), INCLUDE_TEMPLATE)
+
+        print(f"Link data for {len(categories)} categories in {data_dir}/")
+        print(f"  - Written: {', '.join(written) if written else 'none (all unchanged)'}")
+        if removed:
+            print(f"  - Removed: {', '.join(removed)}")
+        if include_written:
+            print(f"  - Wrote {include_path}")
+
+        link_counts = {category_id: len(links) for category_id, links in categories.items()}
+        return {
+            'categories_with_links': len(categories),
+            'total_links': sum(link_counts.values()),
+            'data_files_written': len(written),
+            'data_files_removed': len(removed),
+            'changed_categories': written + removed,
+            'link_counts': link_counts
+        }
+
+    except Exception as e:
+        run_log.record_error(e)
+        print(f"Fatal error writing link data: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Write per-category Jekyll data files from categorized links")
+    parser.parse_args(argv)
+
+    stats = write_link_data()
+    print(f"\n{stats['total_links']} links in {stats['categories_with_links']} data files "
+          f"({stats['data_files_written']} written, {stats['data_files_removed']} removed)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Compiled keyword matching engine for link categorization.
+
+Keywords in config/categories.yml are either plain strings, matched as
+case-insensitive substrings, or mappings with word-boundary semantics:
+
+    - "colour"                          # substring match
+    - {keyword: "aria", match: word}    # whole tokens only
+
+Text is tokenized into runs of letters and digits. A word keyword matches
+when its tokens appear consecutively in the link's tokens, so "aria" matches
+"aria-label" but not "variable", and "color contrast" matches "color-contrast".
+
+KeywordEngine tokenizes each link's "{href_norm} {text_norm}" once and
+resolves keywords through hash lookups instead of scanning every keyword:
+word keywords are looked up by token, and substring keywords made only of
+letters and digits are resolved per unique token (such a keyword can only
+occur inside a single token) and memoized. Only substring keywords containing
+punctuation or spaces are still scanned.
+
+URL-side hits are cached per host and path segment: a keyword without "/" can
+only occur inside one "/"-separated part of href_norm, so each unique part
+(e.g. "material.io", "resources", "codepen.io") is resolved once and reused
+by every link that shares it. Only keywords containing "/" are checked
+against the whole href, and only keywords containing a space can span the
+join between URL and text, so just those are checked against the full
+search text.
+
+Results are identical to the reference match_keywords()/categorize_link()
+path in categorize_links.py.
+"""
+
+import re
+
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+MATCH_SUBSTRING = 'substring'
+MATCH_WORD = 'word'
+
+def tokenize(text):
+    """Split lowercased text into runs of letters and digits."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def keyword_spec(entry):
+    """Return (keyword, match_mode) for a keyword entry from categories.yml."""
+    if isinstance(entry, dict):
+        keyword = entry['keyword']
+        mode = entry.get('match', MATCH_SUBSTRING)
+    else:
+        keyword = entry
+        mode = MATCH_SUBSTRING
+    if mode not in (MATCH_SUBSTRING, MATCH_WORD):
+        raise ValueError(f"Unknown match mode '{mode}' for keyword '{keyword}'")
+    return keyword, mode
+
+def contains_sequence(tokens, sequence):
+    """Check whether sequence appears as consecutive items in tokens."""
+    length = len(sequence)
+    first = sequence[0]
+    for i, token in enumerate(tokens):
+        if token == first and tuple(tokens[i:i + length]) == sequence:
+            return True
+    return False
+
+def keyword_matches(keyword, mode, text_lower, tokens):
+    """Reference check of one keyword against lowercased text and its tokens."""
+    if mode == MATCH_WORD:
+        sequence = tuple(tokenize(keyword))
+        if sequence:
+            return contains_sequence(tokens, sequence)
+    return keyword.lower() in text_lower
+
+class KeywordEngine:
+    """Category keyword rules compiled into token lookup tables."""
+
+    def __init__(self, categories):
+        self.category_ids = list(categories.keys())
+        # Keyword IDs increase with category priority and keyword order,
+        # so the lowest matching ID per category is the reference match.
+        self.keywords = []
+        self.token_substring = []    # (kid, keyword) alphanumeric substrings
+        self.scan_segment = []       # (kid, keyword) punctuated substrings without "/" or " "
+        self.scan_href = []          # (kid, keyword) substrings containing "/" but no " "
+        self.scan_full = []          # (kid, keyword) substrings containing " "
+        self.word_single = {}        # token -> [kid]
+        self.word_multi = {}         # first token -> [(kid, token tuple)]
+
+        for category_index, category_id in enumerate(self.category_ids):
+            for entry in categories[category_id].get('keywords', []):
+                keyword, mode = keyword_spec(entry)
+                kid = len(self.keywords)
+                self.keywords.append((category_index, keyword))
+                lowered = keyword.lower()
+                sequence = tuple(tokenize(keyword)) if mode == MATCH_WORD else ()
+
+                if len(sequence) == 1:
+                    self.word_single.setdefault(sequence[0], []).append(kid)
+                elif len(sequence) > 1:
+                    self.word_multi.setdefault(sequence[0], []).append((kid, sequence))
+                elif TOKEN_PATTERN.fullmatch(lowered):
+                    self.token_substring.append((kid, lowered))
+                elif ' ' in lowered:
+                    self.scan_full.append((kid, lowered))
+                elif '/' in lowered:
+                    self.scan_href.append((kid, lowered))
+                else:
+                    self.scan_segment.append((kid, lowered))
+
+        self.token_hits = {}
+        self.segment_hits = {}
+        self.stats = {'token_lookups': 0, 'token_cache_hits': 0,
+                      'url_segment_lookups': 0, 'url_segment_cache_hits': 0}
+
+    def hits_for_token(self, token):
+        """Return the keyword IDs satisfied by one token (memoized)."""
+        self.stats['token_lookups'] += 1
+        hits = self.token_hits.get(token)
+        if hits is None:
+            hits = [kid for kid, keyword in self.token_substring if keyword in token]
+            hits.extend(self.word_single.get(token, ()))
+            hits = self.token_hits[token] = tuple(hits)
+        else:
+            self.stats['token_cache_hits'] += 1
+        return hits
+
+    def hits_for_segment(self, segment):
+        """Return the keyword IDs found inside one "/"-separated URL part (memoized)."""
+        self.stats['url_segment_lookups'] += 1
+        hits = self.segment_hits.get(segment)
+        if hits is None:
+            found = set()
+            for token in set(TOKEN_PATTERN.findall(segment)):
+                found.update(self.hits_for_token(token))
+            for kid, keyword in self.scan_segment:
+                if keyword in segment:
+                    found.add(kid)
+            hits = self.segment_hits[segment] = tuple(found)
+        else:
+            self.stats['url_segment_cache_hits'] += 1
+        return hits
+
+    def url_hits(self, href_lower):
+        """Return the keyword IDs matching a lowercased href on its own."""
+        matched = set()
+        for segment in href_lower.split('/'):
+            matched.update(self.hits_for_segment(segment))
+        for kid, keyword in self.scan_href:
+            if keyword in href_lower:
+                matched.add(kid)
+        return matched
+
+    def text_hits(self, text_lower):
+        """Return the keyword IDs matching lowercased link text on its own."""
+        matched = set()
+        for token in set(TOKEN_PATTERN.findall(text_lower)):
+            matched.update(self.hits_for_token(token))
+        for kid, keyword in self.scan_segment:
+            if keyword in text_lower:
+                matched.add(kid)
+        for kid, keyword in self.scan_href:
+            if keyword in text_lower:
+                matched.add(kid)
+        return matched
+
+    def spanning_hits(self, search_lower):
+        """Return keyword IDs that need the full search text (may span URL and text)."""
+        matched = set()
+        for kid, keyword in self.scan_full:
+            if keyword in search_lower:
+                matched.add(kid)
+
+        if self.word_multi:
+            tokens = TOKEN_PATTERN.findall(search_lower)
+            for i, token in enumerate(tokens):
+                for kid, sequence in self.word_multi.get(token, ()):
+                    if tuple(tokens[i:i + len(sequence)]) == sequence:
+                        matched.add(kid)
+
+        return matched
+
+    def cache_report(self):
+        """Return cache hit rates for profiling output."""
+        def rate(hits, lookups):
+            return round(hits / lookups * 100, 1) if lookups else 0.0
+
+        return {
+            **self.stats,
+            'unique_url_segments': len(self.segment_hits),
+            'unique_tokens': len(self.token_hits),
+            'url_segment_hit_rate': rate(self.stats['url_segment_cache_hits'], self.stats['url_segment_lookups']),
+            'token_hit_rate': rate(self.stats['token_cache_hits'], self.stats['token_lookups'])
+        }
+
+    def resolve(self, matched):
+        """Turn matched keyword IDs into [(category_id, keyword)] in priority order."""
+        matches = []
+        seen_categories = set()
+        for kid in sorted(matched):
+            category_index, keyword = self.keywords[kid]
+            if category_index not in seen_categories:
+                seen_categories.add(category_index)
+                matches.append((self.category_ids[category_index], keyword))
+        return matches
+
+    def match(self, href_norm, text_norm):
+        """Return [(category_id, matched_keyword)] for a link, in priority order."""
+        href_lower = href_norm.lower()
+        text_lower = text_norm.lower()
+        matched = self.url_hits(href_lower)
+        matched |= self.text_hits(text_lower)
+        matched |= self.spanning_hits(f"{href_lower} {text_lower}")
+        return self.resolve(matched)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Persistent cross-run link history in SQLite.
+categorize_links.py appends every run's categorized links to temp/links.sqlite;
+the QA report and dry-run read deltas between runs from here instead of
+recomputing them from the full JSON dumps.
+
+Runs are compared by href_norm, since link IDs are regenerated on every extraction.
+"""
+
+import argparse
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+STORE_PATH = Path('temp/links.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    link_id TEXT NOT NULL,
+    order_index INTEGER NOT NULL,
+    href_norm TEXT,
+    text_final TEXT,
+    category TEXT,
+    action TEXT NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_links_run_action ON links(run_id, action);
+CREATE INDEX IF NOT EXISTS idx_links_href_run ON links(href_norm, run_id);
+CREATE INDEX IF NOT EXISTS idx_links_category_run ON links(category, run_id);
+"""
+
+def connect(path=STORE_PATH):
+    """Open the link store, creating the schema if needed."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def record_run(conn, categorized_links, label=None):
+    """Append one run's categorized links and return its run ID."""
+    now = datetime.now(timezone.utc)
+    label = label or now.strftime('%Y%m%d-%H%M%S')
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (label, created_at) VALUES (?, ?)",
+            (label, now.isoformat(timespec='seconds'))
+        )
+        run_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO links (run_id, link_id, order_index, href_norm, text_final, category, action, reason) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (run_id, link['id'], order_index, link['href_norm'], link['text_final'],
+                 link['category'], link['action'], link['reason'])
+                for order_index, link in enumerate(categorized_links)
+            )
+        )
+    return run_id
+
+def list_runs(conn):
+    """Return all runs, oldest first."""
+    return conn.execute(
+        "SELECT r.run_id, r.label, r.created_at, "
+        "(SELECT COUNT(*) FROM links l WHERE l.run_id = r.run_id AND l.action = 'added') AS added "
+        "FROM runs r ORDER BY r.run_id"
+    ).fetchall()
+
+def latest_run_ids(conn, count=2):
+    """Return up to `count` most recent run IDs, newest first."""
+    rows = conn.execute("SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?", (count,)).fetchall()
+    return [row['run_id'] for row in rows]
+
+def links_added_since(conn, since_run, to_run):
+    """Links added in to_run whose URL was not added in since_run."""
+    return conn.execute(
+        "SELECT l.href_norm, l.text_final, l.category FROM links l "
+        "WHERE l.run_id = ? AND l.action = 'added' AND NOT EXISTS ("
+        "  SELECT 1 FROM links p WHERE p.href_norm = l.href_norm AND p.run_id = ? AND p.action = 'added'"
+        ") ORDER BY l.order_index",
+        (to_run, since_run)
+    ).fetchall()
+
+def links_removed_since(conn, since_run, to_run):
+    """Links added in since_run whose URL is no longer added in to_run."""
+    return links_added_since(conn, to_run, since_run)
+
+def category_changes(conn, from_run, to_run):
+    """Links added in both runs whose category differs."""
+    return conn.execute(
+        "SELECT c.href_norm, c.text_final, p.category AS from_category, c.category AS to_category "
+        "FROM links c JOIN links p ON p.href_norm = c.href_norm AND p.run_id = ? AND p.action = 'added' "
+        "WHERE c.run_id = ? AND c.action = 'added' AND p.category != c.category "
+        "ORDER BY c.order_index",
+        (from_run, to_run)
+    ).fetchall()
+
+def category_drift(conn, limit_runs=None):
+    """Per-run added-link counts per category, oldest run first."""
+    run_filter = ""
+    params = ()
+    if limit_runs:
+        run_filter = "AND l.run_id IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)"
+        params = (limit_runs,)
+    return conn.execute(
+        "SELECT l.run_id, r.label, l.category, COUNT(*) AS link_count "
+        "FROM links l JOIN runs r ON r.run_id = l.run_id "
+        f"WHERE l.action = 'added' {run_filter} "
+        "GROUP BY l.run_id, l.category ORDER BY l.run_id, l.category",
+        params
+    ).fetchall()
+
+def run_delta(conn, since_run=None, to_run=None):
+    """Summarize changes between two runs (default: the latest two).
+
+    Returns None when the store has fewer than two runs to compare.
+    """
+    if to_run is None or since_run is None:
+        latest = latest_run_ids(conn, 2)
+        if len(latest) < 2:
+            return None
+        to_run = to_run if to_run is not None else latest[0]
+        since_run = since_run if since_run is not None else latest[1]
+
+    added = links_added_since(conn, since_run, to_run)
+    removed = links_removed_since(conn, since_run, to_run)
+    moved = category_changes(conn, since_run, to_run)
+
+    return {
+        'since_run': since_run,
+        'to_run': to_run,
+        'links_added': len(added),
+        'links_removed': len(removed),
+        'category_changes': len(moved),
+        'added': [dict(row) for row in added],
+        'removed': [dict(row) for row in removed],
+        'moved': [dict(row) for row in moved]
+    }
+
+def load_delta(path=STORE_PATH):
+    """Read the delta between the latest two runs, or None if unavailable."""
+    if not Path(path).exists():
+        return None
+    conn = connect(path)
+    try:
+        return run_delta(conn)
+    finally:
+        conn.close()
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Query the cross-run link history")
+    parser.add_argument('--db', default=str(STORE_PATH),
+                        help=f"path to the link store (default: {STORE_PATH})")
+    subparsers = parser.add_subparsers(dest='query', required=True)
+
+    subparsers.add_parser('runs', help="list recorded runs")
+
+    added_parser = subparsers.add_parser('added-since', help="links added since a run")
+    added_parser.add_argument('run_id', type=int)
+    added_parser.add_argument('--to', type=int, default=None, help="compare against this run (default: latest)")
+
+    drift_parser = subparsers.add_parser('drift', help="per-category link counts over time")
+    drift_parser.add_argument('--last', type=int, default=None, help="only the last N runs")
+
+    changed_parser = subparsers.add_parser('changed', help="links whose category changed between runs")
+    changed_parser.add_argument('--from', dest='from_run', type=int, default=None)
+    changed_parser.add_argument('--to', dest='to_run', type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        print(f"Error: {args.db} not found. Run categorize_links.py first.", file=sys.stderr)
+        sys.exit(1)
+
+    conn = connect(args.db)
+
+    if args.query == 'runs':
+        for row in list_runs(conn):
+            print(f"{row['run_id']:>5}  {row['label']}  {row['created_at']}  added={row['added']}")
+
+    elif args.query == 'added-since':
+        to_run = args.to if args.to is not None else latest_run_ids(conn, 1)[0]
+        rows = links_added_since(conn, args.run_id, to_run)
+        for row in rows:
+            print(f"{row['category']:<6} {row['href_norm']}  {row['text_final']}")
+        print(f"\n{len(rows)} links added in run {to_run} since run {args.run_id}")
+
+    elif args.query == 'drift':
+        current_run = None
+        for row in category_drift(conn, args.last):
+            if row['run_id'] != current_run:
+                current_run = row['run_id']
+                print(f"\nRun {row['run_id']} ({row['label']})")
+            print(f"  - {row['category']}: {row['link_count']}")
+
+    elif args.query == 'changed':
+        latest = latest_run_ids(conn, 2)
+        if len(latest) < 2 and (args.from_run is None or args.to_run is None):
+            print("Need at least two runs to compare")
+            return
+        to_run = args.to_run if args.to_run is not None else latest[0]
+        from_run = args.from_run if args.from_run is not None else latest[1]
+        rows = category_changes(conn, from_run, to_run)
+        for row in rows:
+            print(f"{row['from_category']} -> {row['to_category']}  {row['href_norm']}")
+        print(f"\n{len(rows)} links changed category between run {from_run} and run {to_run}")
+
+    conn.close()
+
+if __name__ == '__main__':
+    main()
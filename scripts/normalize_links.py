@@ -2,49 +2,23 @@
 """
 Normalize URLs and de-duplicate strictly.
 Takes temp/links_raw.json and produces temp/links_normalized.json and temp/duplicates.csv
+Tracking parameters, host aliases and path variants are canonicalized by the
+rules in config/canonicalization.yml (see canonicalization.py).
 """
 
+import argparse
 import json
 import csv
 import sys
 import re
 import html
-from urllib.parse import urlparse, parse_qs, urlunparse
+from urllib.parse import urlparse, urlunparse
 from pathlib import Path
 from collections import defaultdict
 
-def clean_tracking_params(url):
-    """Remove tracking parameters from URL."""
-    tracking_params = {
-        'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
-        'gclid', 'fbclid', 'mc_cid', 'mc_eid'
-    }
-    
-    parsed = urlparse(url)
-    if not parsed.query:
-        return url
-    
-    query_params = parse_qs(parsed.query)
-    cleaned_params = {k: v for k, v in query_params.items() if k not in tracking_params}
-    
-    # Rebuild query string
-    if cleaned_params:
-        query_pairs = []
-        for key, values in cleaned_params.items():
-            for value in values:
-                query_pairs.append(f"{key}={value}")
-        new_query = '&'.join(query_pairs)
-    else:
-        new_query = ''
-    
-    return urlunparse((
-        parsed.scheme,
-        parsed.netloc,
-        parsed.path,
-        parsed.params,
-        new_query,
-        ''  # Remove fragment
-    ))
+import canonicalization
+import run_log
+from checkpoint import DEFAULT_BATCH_SIZE, Checkpoint
 
 def normalize_url(href_raw):
     """Normalize a URL with strict validation."""
@@ -74,17 +48,27 @@ def normalize_url(href_raw):
         if not path:
             path = ''
         
-        # Remove tracking params and fragments
-        cleaned_url = urlunparse((scheme, netloc, path, parsed.params, parsed.query, ''))
-        normalized_url = clean_tracking_params(cleaned_url)
+        # Apply host aliases, path rewrites and tracking-param removal; drop fragments
+        netloc, path, query = canonicalization.default_canonicalizer().apply(netloc, path, parsed.query)
+        normalized_url = urlunparse((scheme, netloc, path, parsed.params, query, ''))
         
         return normalized_url, None
-        
+    
     except Exception as e:
         return None, f"Parse error: {str(e)}"
 
-def normalize_links():
-    """Normalize all extracted links and identify duplicates."""
+@run_log.instrument('normalize')
+def normalize_links(url_cache=None, text_dedup=False, text_threshold=0.8, resume=False,
+                    batch_size=DEFAULT_BATCH_SIZE):
+    """Normalize all extracted links and identify duplicates.
+    
+    url_cache, when given, memoizes normalize_url results by raw href across
+    calls (used by the watch daemon to keep normalization warm).
+    text_dedup also groups links with different URLs but near-identical text
+    (see text_dedup.py); those groups are reported with match_type "text".
+    Progress is checkpointed every batch_size links; resume continues from
+    the last committed batch of an interrupted run (see checkpoint.py).
+    """
     try:
         # Read raw links
         raw_path = Path('temp/links_raw.json')
@@ -97,16 +81,29 @@ def normalize_links():
         
         print(f"Processing {len(raw_links)} raw links")
         
-        normalized_links = []
+        checkpoint = Checkpoint('normalize', [raw_path, canonicalization.CONFIG_PATH], batch_size)
+        normalized_links, saved_stats = checkpoint.start(resume)
         url_to_ids = defaultdict(list)  # Track duplicates
+        url_cache_hits = saved_stats['url_cache_hits'] if saved_stats else 0
+        
+        for link in normalized_links:
+            if link['href_norm']:
+                url_to_ids[link['href_norm']].append(link['id'])
         
-        for link in raw_links:
+        for link in raw_links[len(normalized_links):]:
             link_id = link['id']
             href_raw = link['href_raw']
             text_raw = link['text_raw']
             
             # Normalize URL
-            href_norm, invalid_reason = normalize_url(href_raw)
+            if url_cache is None:
+                href_norm, invalid_reason = normalize_url(href_raw)
+            else:
+                if href_raw in url_cache:
+                    url_cache_hits += 1
+                else:
+                    url_cache[href_raw] = normalize_url(href_raw)
+                href_norm, invalid_reason = url_cache[href_raw]
             
             # Normalize text
             text_norm = text_raw.strip()
@@ -126,6 +123,9 @@ def normalize_links():
             # Track for duplicate detection
             if href_norm:
                 url_to_ids[href_norm].append(link_id)
+            
+            if checkpoint.add(normalized_link):
+                checkpoint.commit({'url_cache_hits': url_cache_hits}, link['order_index'])
         
         # Identify duplicates
         duplicates = []
@@ -138,6 +138,25 @@ def normalize_links():
                     'duplicate_count': len(ids)
                 })
         
+        # Fuzzy text duplicates among links with distinct URLs
+        text_duplicates = []
+        if text_dedup:
+            from text_dedup import find_text_duplicates
+            
+            canonical_links = [
+                link for link in normalized_links
+                if link['valid_url'] and url_to_ids[link['href_norm']][0] == link['id']
+            ]
+            groups, text_stats = find_text_duplicates(canonical_links, threshold=text_threshold)
+            for positions in groups:
+                ids = [canonical_links[position]['id'] for position in positions]
+                text_duplicates.append({
+                    'href_norm': canonical_links[positions[0]]['href_norm'],
+                    'duplicate_ids': ids,
+                    'canonical_id': ids[0],
+                    'duplicate_count': len(ids)
+                })
+        
         valid_count = sum(1 for link in normalized_links if link['valid_url'])
         invalid_count = len(normalized_links) - valid_count
         duplicate_url_count = len(duplicates)
@@ -150,6 +169,14 @@ def normalize_links():
         print(f"  - Unique URLs: {len(url_to_ids)}")
         print(f"  - Duplicate URLs: {duplicate_url_count}")
         print(f"  - Duplicate links: {duplicate_link_count}")
+        if text_dedup:
+            print(f"  - Text duplicate groups: {len(text_duplicates)} "
+                  f"({text_stats['verified_pairs']}/{text_stats['candidate_pairs']} candidate pairs verified)")
+        
+        if url_cache is not None:
+            run_log.record_cache('url_cache', url_cache_hits, len(raw_links))
+        if text_dedup:
+            run_log.record_counts(text_stats, prefix='text_dedup_')
         
         # Write normalized links
         normalized_path = Path('temp/links_normalized.json')
@@ -160,34 +187,56 @@ def normalize_links():
         # Write duplicates CSV
         duplicates_path = Path('temp/duplicates.csv')
         with open(duplicates_path, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = ['href_norm', 'canonical_id', 'duplicate_count', 'all_ids']
+            fieldnames = ['href_norm', 'canonical_id', 'duplicate_count', 'all_ids', 'match_type']
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             
-            for dup in duplicates:
-                writer.writerow({
-                    'href_norm': dup['href_norm'],
-                    'canonical_id': dup['canonical_id'],
-                    'duplicate_count': dup['duplicate_count'],
-                    'all_ids': ','.join(dup['duplicate_ids'])
-                })
+            for match_type, groups in (('url', duplicates), ('text', text_duplicates)):
+                for dup in groups:
+                    writer.writerow({
+                        'href_norm': dup['href_norm'],
+                        'canonical_id': dup['canonical_id'],
+                        'duplicate_count': dup['duplicate_count'],
+                        'all_ids': ','.join(dup['duplicate_ids']),
+                        'match_type': match_type
+                    })
         print(f"Wrote duplicates report to {duplicates_path}")
         
+        checkpoint.finish()
+        
         return {
             'total': len(normalized_links),
             'valid': valid_count,
             'invalid': invalid_count,
             'unique_urls': len(url_to_ids),
             'duplicate_urls': duplicate_url_count,
-            'duplicate_links': duplicate_link_count
+            'duplicate_links': duplicate_link_count,
+            'text_duplicate_groups': len(text_duplicates)
         }
-        
+    
     except Exception as e:
+        run_log.record_error(e)
         print(f"Fatal error during normalization: {e}", file=sys.stderr)
         sys.exit(1)
 
-if __name__ == '__main__':
-    stats = normalize_links()
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Normalize extracted URLs and detect duplicates")
+    parser.add_argument('--text-dedup', action='store_true',
+                        help="also report links with different URLs but near-identical text")
+    parser.add_argument('--text-threshold', type=float, default=0.8,
+                        help="trigram Jaccard similarity for text duplicates (default: 0.8)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue from the last checkpoint of an interrupted run")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"links per checkpoint batch (default: {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args(argv)
+    
+    stats = normalize_links(text_dedup=args.text_dedup, text_threshold=args.text_threshold,
+                            resume=args.resume, batch_size=args.checkpoint_every)
     print(f"Successfully normalized {stats['total']} links")
     print(f"Valid: {stats['valid']}, Invalid: {stats['invalid']}")
     print(f"Unique URLs: {stats['unique_urls']}, Duplicates: {stats['duplicate_links']}")
+
+if __name__ == '__main__':
+    main()
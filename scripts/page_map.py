@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Page map for multi-page output: which Markdown pages hold which sections.
+
+apply_changes.py and dry_run_apply.py take --pages <yaml>, e.g.
+
+    pages:
+      index.md: all
+      plan-and-organise.md: ["1"]          # every 1.x category
+      create-and-deliver.md: ["2"]
+      archive/2024.md: ["3.A", "3.B"]
+
+Each entry is a category ID or an ID prefix ("2.A" selects 2.A, 2.A.1,
+2.A.2, ...); `all` selects every category. Without --pages the stages behave
+as before and update only index.md with every category.
+
+Each page is read once and indexed into a heading -> section map; pages are
+independent, so they are processed concurrently in a thread pool and only
+pages whose content changes are written back.
+"""
+
+import sys
+from pathlib import Path
+
+from taxonomy import load_taxonomy
+
+DEFAULT_PAGE = 'index.md'
+
+def select_categories(entries, taxonomy):
+    """Expand a page's category entries into category IDs in display order."""
+    if entries == 'all' or entries is None:
+        return taxonomy.ids
+    if isinstance(entries, str):
+        entries = [entries]
+
+    prefixes = [str(entry) for entry in entries]
+    unknown = [prefix for prefix in prefixes
+               if not any(category_id == prefix or category_id.startswith(prefix + '.') for category_id in taxonomy.ids)]
+    if unknown:
+        raise ValueError(f"Unknown categories in page map: {unknown}")
+
+    return tuple(
+        category_id for category_id in taxonomy.ids
+        if any(category_id == prefix or category_id.startswith(prefix + '.') for prefix in prefixes)
+    )
+
+def load_page_map(path=None, taxonomy=None):
+    """Return {page path: tuple of category IDs} from a page map YAML file.
+
+    With no path, the single-page default {index.md: every category} is returned.
+    """
+    taxonomy = taxonomy or load_taxonomy()
+    if path is None:
+        return {Path(DEFAULT_PAGE): taxonomy.ids}
+
+    import yaml
+
+    path = Path(path)
+    if not path.exists():
+        print(f"Error: page map {path} not found", file=sys.stderr)
+        sys.exit(1)
+    with open(path, 'r', encoding='utf-8') as f:
+        pages = (yaml.safe_load(f) or {}).get('pages') or {}
+    if not pages:
+        print(f"Error: page map {path} lists no pages", file=sys.stderr)
+        sys.exit(1)
+
+    # Page paths are relative to the repository root, like index.md
+    return {Path(page): select_categories(entries, taxonomy) for page, entries in pages.items()}
+
+def is_heading(line):
+    """Check for a Markdown ATX heading: up to 3 spaces, 1-6 "#", then a space or the line end.
+
+    Wrapped link text such as "  #F2F2F2, Grey" is not a heading.
+    """
+    stripped = line.lstrip(' ')
+    if len(line) - len(stripped) > 3:
+        return False
+    level = len(stripped) - len(stripped.lstrip('#'))
+    return 1 <= level <= 6 and (len(stripped) == level or stripped[level] in ' \t')
+
+def section_index(lines, taxonomy):
+    """Map category ID -> (heading line, end line) for the sections on one page.
+
+    A section's body runs from the line after its heading up to (not
+    including) the next Markdown heading, or the end of the page.
+    """
+    sections = {}
+    for i, line in enumerate(lines):
+        category_id = taxonomy.category_for_heading(line)
+        if category_id is None:
+            continue
+        end = i + 1
+        while end < len(lines) and not is_heading(lines[end]):
+            end += 1
+        sections[category_id] = (i, end)
+    return sections
+
+def map_pages(function, pages, workers=None):
+    """Run function(page) for every page concurrently, returning results in page order."""
+    pages = list(pages)
+    if len(pages) <= 1 or workers == 1:
+        return [function(page) for page in pages]
+
+    # Imported lazily; the thread pool is only needed for more than one page
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers or min(8, len(pages))) as executor:
+        return list(executor.map(function, pages))
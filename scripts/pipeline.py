@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Run pipeline stages in-process with shared warm state.
+Used by `designops run` and the watch daemon. Stage modules are imported
+lazily so running a light stage never loads BeautifulSoup, lxml or PyYAML.
+
+Finished stages are recorded in temp/checkpoints/pipeline.json; with
+--resume, stages finished by an interrupted run are skipped and normalize
+and categorize continue from their last committed batch (see checkpoint.py).
+
+With --pipelined, extract, normalize and categorize run concurrently as one
+"stream" stage connected by bounded queues (see stream_pipeline.py).
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import run_log
+from checkpoint import PipelineProgress
+
+# Pipeline stages in execution order
+STAGE_ORDER = ['extract', 'normalize', 'categorize', 'snippets', 'search', 'dry_run', 'qa']
+# Stages replaced by the single "stream" stage with --pipelined
+STREAMED_STAGES = ['extract', 'normalize', 'categorize']
+
+class PipelineState:
+    """Warm in-memory state shared by stage runs."""
+
+    def __init__(self):
+        self.categories = None
+        self.engine = None
+        self.url_cache = {}
+        self.index_structure = None
+
+    def invalidate_categories(self):
+        """Drop cached category rules after config/categories.yml changes."""
+        self.categories = None
+        self.engine = None
+
+    def invalidate_canonicalization(self):
+        """Recompile URL rules and forget normalized URLs after config/canonicalization.yml changes."""
+        import canonicalization
+        canonicalization.reset()
+        self.url_cache.clear()
+
+    def invalidate_index(self):
+        """Drop the cached index.md section map after index.md changes."""
+        self.index_structure = None
+
+    def load_categories(self):
+        """Load category rules and compile the keyword engine once."""
+        if self.categories is None:
+            import categorize_links
+            from keyword_engine import KeywordEngine
+            self.categories = categorize_links.load_categories()
+            self.engine = KeywordEngine(self.categories)
+
+    def run_stage(self, stage, resume=False):
+        """Run one stage in-process and return True on success."""
+        if stage == 'stream':
+            import stream_pipeline
+            self.load_categories()
+            return stream_pipeline.run_streaming(categories=self.categories, engine=self.engine,
+                                                 url_cache=self.url_cache) is not None
+        if stage == 'extract':
+            import extract_links
+            return extract_links.extract_links() is not None
+        if stage == 'normalize':
+            import normalize_links
+            return normalize_links.normalize_links(url_cache=self.url_cache, resume=resume) is not None
+        if stage == 'categorize':
+            import categorize_links
+            self.load_categories()
+            return categorize_links.categorize_links(categories=self.categories, engine=self.engine,
+                                                     resume=resume) is not None
+        if stage == 'snippets':
+            import generate_snippets
+            return generate_snippets.generate_snippets() is not None
+        if stage == 'search':
+            import search_index
+            return search_index.build_search_index() is not None
+        if stage == 'dry_run':
+            import dry_run_apply
+            if self.index_structure is None:
+                self.index_structure = dry_run_apply.load_index_structure()
+                if self.index_structure is None:
+                    return False
+            return dry_run_apply.dry_run_apply(index_structure=self.index_structure, structured=True)
+        if stage == 'qa':
+            import generate_qa_report
+            return generate_qa_report.generate_qa_report() is not None
+        raise ValueError(f"Unknown stage: {stage}")
+
+    def run(self, stages, verbose=False, resume=False):
+        """Run stages in order, stopping at the first failure."""
+        try:
+            return self.run_stages(stages, verbose, resume)
+        finally:
+            # Refresh the metrics file (if configured) after every run, e.g. each watch cycle
+            run_log.write_metrics()
+
+    def run_stages(self, stages, verbose=False, resume=False):
+        """Run stages in order without writing metrics; see run()."""
+        total_start = time.perf_counter()
+        progress = PipelineProgress()
+        completed = progress.completed() if resume else []
+        if not resume:
+            progress.reset()
+
+        for stage in stages:
+            if stage in completed:
+                print(f"  ⏭️  {stage}: finished in the interrupted run")
+                continue
+            start = time.perf_counter()
+            output = io.StringIO()
+            try:
+                if verbose:
+                    ok = self.run_stage(stage, resume)
+                else:
+                    with contextlib.redirect_stdout(output):
+                        ok = self.run_stage(stage, resume)
+            except SystemExit:
+                ok = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            if not ok:
+                print(f"  ❌ {stage} failed after {elapsed_ms:.1f} ms")
+                if not verbose and output.getvalue():
+                    print(output.getvalue().rstrip())
+                return False
+            progress.mark_done(stage)
+            print(f"  ✅ {stage}: {elapsed_ms:.1f} ms")
+
+        progress.reset()
+        print(f"Pipeline finished in {(time.perf_counter() - total_start) * 1000:.1f} ms")
+        return True
+
+def main(argv=None):
+    """Command-line entry point."""
+    import sys
+
+    parser = argparse.ArgumentParser(description="Run pipeline stages in one process")
+    parser.add_argument('--stages', default=','.join(STAGE_ORDER),
+                        help=f"comma-separated stages to run (default: {','.join(STAGE_ORDER)})")
+    parser.add_argument('--verbose', action='store_true',
+                        help="show each stage's full output")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip stages finished by an interrupted run and resume checkpointed stages")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="run extract, normalize and categorize concurrently with bounded queues")
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGE_ORDER]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    # Always run in pipeline order regardless of how the stages were listed
+    stages = [stage for stage in STAGE_ORDER if stage in stages]
+    if args.pipelined:
+        if not all(stage in stages for stage in STREAMED_STAGES):
+            parser.error(f"--pipelined needs all of: {', '.join(STREAMED_STAGES)}")
+        if args.resume:
+            parser.error("--pipelined cannot be combined with --resume")
+        stages = ['stream'] + [stage for stage in stages if stage not in STREAMED_STAGES]
+    if not PipelineState().run(stages, verbose=args.verbose, resume=args.resume):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Index of links already published in index.md.
+
+index.md is scanned once for Markdown links (link text may wrap over several
+lines and URLs may contain balanced parentheses). Their normalized URLs go
+into a Bloom filter plus an exact set: the filter rejects most new URLs with
+a few hash probes, and the exact set confirms the rare filter hits so false
+positives never skip a link. Both are persisted to
+temp/published_links.json together with the SHA-256 of index.md, so later
+runs rebuild them only when the page changes.
+
+categorize_links.py --skip-published uses it to skip links already on the
+page with reason `already_published` before doing any keyword matching.
+"""
+
+import base64
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import canonicalization
+
+INDEX_PATH = Path('index.md')
+CACHE_PATH = Path('temp/published_links.json')
+
+def find_closing_bracket(text, start):
+    """Return the index of the "]" closing the "[" at start, or -1."""
+    depth = 0
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                return i
+        elif char == '\n' and text.startswith('\n', i + 1):
+            # A blank line ends the paragraph, so the link text too
+            return -1
+        i += 1
+    return -1
+
+def parse_destination(text, start):
+    """Parse "(url "title")" starting at start; return (url, end index) or (None, start)."""
+    i = start + 1
+    while i < len(text) and text[i] in ' \t\n':
+        i += 1
+
+    if text.startswith('<', i):
+        close = text.find('>', i)
+        if close == -1 or '\n' in text[i:close]:
+            return None, start
+        url = text[i + 1:close]
+        i = close + 1
+    else:
+        depth = 0
+        url_start = i
+        while i < len(text):
+            char = text[i]
+            if char == '\\':
+                i += 2
+                continue
+            if char in ' \t\n':
+                break
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            i += 1
+        url = text[url_start:i]
+
+    # Optional title
+    while i < len(text) and text[i] in ' \t\n':
+        i += 1
+    if i < len(text) and text[i] in '"\'(':
+        closer = ')' if text[i] == '(' else text[i]
+        close = text.find(closer, i + 1)
+        if close == -1:
+            return None, start
+        i = close + 1
+        while i < len(text) and text[i] in ' \t\n':
+            i += 1
+
+    if i >= len(text) or text[i] != ')':
+        return None, start
+    return url, i + 1
+
+def iter_markdown_links(text):
+    """Yield (link_text, url) for every inline Markdown link in text.
+
+    Link text may span lines and contain nested brackets (e.g. an image);
+    URLs may contain balanced parentheses. Images themselves are skipped.
+    """
+    i = text.find('[')
+    while i != -1:
+        close = find_closing_bracket(text, i)
+        if close == -1 or not text.startswith('(', close + 1):
+            i = text.find('[', i + 1)
+            continue
+
+        url, end = parse_destination(text, close + 1)
+        if url is None:
+            i = text.find('[', i + 1)
+            continue
+
+        if i == 0 or text[i - 1] != '!':
+            yield ' '.join(text[i + 1:close].split()), url
+        i = text.find('[', end)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one digest."""
+
+    def __init__(self, size_bits, hashes, bits=None):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray((size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01):
+        """Size a filter for capacity items at the given false positive rate."""
+        capacity = max(capacity, 1)
+        size_bits = max(64, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        hashes = max(1, round(size_bits / capacity * math.log(2)))
+        return cls(size_bits, hashes)
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size_bits for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+class PublishedLinks:
+    """Normalized URLs already in index.md: Bloom filter in front of an exact set."""
+
+    def __init__(self, urls, bloom=None, source_hash=None):
+        self.urls = set(urls)
+        self.source_hash = source_hash
+        if bloom is None:
+            bloom = BloomFilter.for_capacity(len(self.urls))
+            for url in self.urls:
+                bloom.add(url)
+        self.bloom = bloom
+        self.stats = {'lookups': 0, 'bloom_rejections': 0, 'false_positives': 0}
+
+    def __contains__(self, href_norm):
+        self.stats['lookups'] += 1
+        if href_norm not in self.bloom:
+            self.stats['bloom_rejections'] += 1
+            return False
+        if href_norm in self.urls:
+            return True
+        self.stats['false_positives'] += 1
+        return False
+
+    def __len__(self):
+        return len(self.urls)
+
+    def to_json(self):
+        return {
+            'source_sha256': self.source_hash,
+            'bloom': {
+                'size_bits': self.bloom.size_bits,
+                'hashes': self.bloom.hashes,
+                'bits': base64.b64encode(bytes(self.bloom.bits)).decode('ascii')
+            },
+            'urls': sorted(self.urls)
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        bloom = BloomFilter(data['bloom']['size_bits'], data['bloom']['hashes'],
+                            base64.b64decode(data['bloom']['bits']))
+        return cls(data['urls'], bloom, data['source_sha256'])
+
+def scan_published_urls(content):
+    """Return the normalized URLs of every valid Markdown link in content."""
+    from normalize_links import normalize_url
+
+    urls = set()
+    for _, url in iter_markdown_links(content):
+        href_norm, _ = normalize_url(url)
+        if href_norm is not None:
+            urls.add(href_norm)
+    return urls
+
+def load_published_links(index_path=INDEX_PATH, cache_path=CACHE_PATH):
+    """Return PublishedLinks for index.md, rebuilt only when its content or the URL rules change."""
+    index_path = Path(index_path)
+    if not index_path.exists():
+        return PublishedLinks([])
+
+    with open(index_path, 'rb') as f:
+        raw = f.read()
+    # URLs are normalized with the canonicalization rules, so they are part of the key
+    source_hash = hashlib.sha256(raw + canonicalization.fingerprint().encode('ascii')).hexdigest()
+
+    cache_path = Path(cache_path)
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('source_sha256') == source_hash:
+                return PublishedLinks.from_json(data)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    published = PublishedLinks(scan_published_urls(raw.decode('utf-8')), source_hash=source_hash)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(published.to_json(), f, indent=2, ensure_ascii=False)
+    except OSError:
+        pass
+    return published
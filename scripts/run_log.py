@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Structured run log and metrics shared by all pipeline stages.
+
+Each stage function is wrapped with @instrument(stage) and appends one JSON
+line per call to temp/run_log.jsonl:
+
+    {"ts": "2025-08-19T21:20:00Z", "run": "3f9c2a1b7d4e", "event": "stage",
+     "stage": "categorize", "status": "ok", "duration_ms": 41.2,
+     "counts": {"total_processed": 336, ...},
+     "ids": {"run_id": 12},
+     "cache": {"tokens": {"hits": 583, "lookups": 1146}, ...}, "errors": []}
+
+Counts come from the numeric fields of the stats dict a stage already returns
+(an int return value is recorded under the name given to @instrument);
+numeric identifiers such as the link store's run_id go to "ids" instead,
+since they are not counts. Stages add cache hit rates or extra counters
+with record_cache() and record_counts() once per call. Hot loops keep
+counting in their own local Counters, so logging costs one file append per
+stage, never per-link I/O.
+
+`designops --metrics <file> <command>` also writes all stage metrics of the
+process in Prometheus text format when the command finishes (suitable for
+the node_exporter textfile collector). The run ID is only exposed as the
+label of designops_run_info, so every other series stays stable across
+runs. `designops --no-run-log` disables the JSON-lines log.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+RUN_LOG_PATH = Path('temp/run_log.jsonl')
+
+_config = {'run_log_path': RUN_LOG_PATH, 'metrics_path': None}
+_local = threading.local()
+_lock = threading.Lock()
+# Aggregated over every stage run in this process, for the metrics file
+_metrics = {'durations': {}, 'runs': {}, 'errors': {}, 'counts': {}, 'cache': {}}
+
+# One ID per process, or shared through the environment by a parent run
+RUN_ID = os.environ.get('DESIGNOPS_RUN_ID') or os.urandom(6).hex()
+
+# Numeric result fields that identify something rather than count it
+IDENTIFIER_FIELDS = frozenset({'run_id'})
+
+def configure(run_log_path=RUN_LOG_PATH, metrics_path=None):
+    """Set where events and metrics go; run_log_path=None disables the event log."""
+    _config['run_log_path'] = Path(run_log_path) if run_log_path else None
+    _config['metrics_path'] = Path(metrics_path) if metrics_path else None
+
+class StageRecord:
+    """Counters collected while one stage runs."""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.status = 'ok'
+        self.duration_ms = 0.0
+        self.counts = {}
+        self.ids = {}
+        self.cache = {}
+        self.errors = []
+
+    def add_counts(self, counts, prefix=''):
+        """Set the numeric entries of counts (later values replace earlier ones)."""
+        for key, value in counts.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            if key in IDENTIFIER_FIELDS:
+                self.ids[prefix + key] = value
+            else:
+                self.counts[prefix + key] = value
+
+    def to_event(self):
+        return {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'run': RUN_ID,
+            'event': 'stage',
+            'stage': self.stage,
+            'status': self.status,
+            'duration_ms': round(self.duration_ms, 1),
+            'counts': self.counts,
+            'ids': self.ids,
+            'cache': self.cache,
+            'errors': self.errors
+        }
+
+def current_stage():
+    """Return the StageRecord of the innermost running stage in this thread, or None."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+def record_counts(counts, prefix=''):
+    """Set numeric counters on the running stage."""
+    record = current_stage()
+    if record is not None:
+        record.add_counts(counts, prefix)
+
+def record_cache(name, hits, lookups):
+    """Record hits/lookups of one cache for the running stage."""
+    record = current_stage()
+    if record is not None:
+        record.cache[name] = {'hits': hits, 'lookups': lookups}
+
+def record_error(error):
+    """Attach an error to the running stage (the stage is marked as failed)."""
+    record = current_stage()
+    if record is not None:
+        record.status = 'error'
+        record.errors.append(f"{type(error).__name__}: {error}"[:500])
+
+def aggregate(record):
+    """Fold a finished stage into the process metrics.
+
+    Durations, counts and cache stats keep the latest run of each stage;
+    run and error totals accumulate.
+    """
+    _metrics['durations'][record.stage] = round(record.duration_ms / 1000, 6)
+    runs_key = (record.stage, record.status)
+    _metrics['runs'][runs_key] = _metrics['runs'].get(runs_key, 0) + 1
+    _metrics['errors'][record.stage] = _metrics['errors'].get(record.stage, 0) + len(record.errors)
+    for key, value in record.counts.items():
+        _metrics['counts'][(record.stage, metric_name(key))] = value
+    for name, stats in record.cache.items():
+        _metrics['cache'][(record.stage, name)] = stats
+
+def emit(record):
+    """Append a finished stage's event to the run log and fold it into the metrics."""
+    with _lock:
+        aggregate(record)
+        path = _config['run_log_path']
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record.to_event(), ensure_ascii=False) + '\n')
+        except OSError:
+            # Monitoring must never break a pipeline run
+            pass
+
+def instrument(stage, result_name=None):
+    """Decorate a stage function to time it and log its outcome.
+
+    A dict result contributes its numeric fields as counts; an int result is
+    recorded as counts[result_name]; None or False marks the stage failed.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            record = StageRecord(stage)
+            stack = getattr(_local, 'stack', None)
+            if stack is None:
+                stack = _local.stack = []
+            stack.append(record)
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except SystemExit as e:
+                if e.code not in (None, 0) and record.status == 'ok':
+                    record.status = 'error'
+                    record.errors.append(f"exit status {e.code}")
+                raise
+            except BaseException as e:
+                record.status = 'error'
+                record.errors.append(f"{type(e).__name__}: {e}"[:500])
+                raise
+            else:
+                if isinstance(result, dict):
+                    record.add_counts(result)
+                elif isinstance(result, int) and not isinstance(result, bool) and result_name:
+                    record.counts[result_name] = result
+                if (result is None or result is False) and record.status == 'ok':
+                    record.status = 'failed'
+                return result
+            finally:
+                record.duration_ms = (time.perf_counter() - start) * 1000
+                stack.pop()
+                emit(record)
+        return wrapper
+    return decorator
+
+def metric_name(name):
+    """Turn a counter key into a Prometheus-safe metric name fragment."""
+    return ''.join(char if char.isalnum() else '_' for char in name).strip('_').lower()
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def render_metrics(metrics):
+    """Render aggregated stage metrics in Prometheus text exposition format."""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP designops_{name} {help_text}")
+        lines.append(f"# TYPE designops_{name} {kind}")
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{escape_label(label)}"' for key, label in labels)
+            lines.append(f"designops_{name}{{{label_text}}} {value}" if labels else f"designops_{name} {value}")
+
+    durations = metrics['durations']
+    runs = metrics['runs']
+    errors = metrics['errors']
+    counts = metrics['counts']
+    cache = metrics['cache']
+
+    family('stage_duration_seconds', 'gauge', "Duration of the last run of each stage.",
+           [((('stage', stage),), value) for stage, value in durations.items()])
+    family('stage_runs_total', 'counter', "Stage runs by outcome.",
+           [((('stage', stage), ('status', status)), value) for (stage, status), value in runs.items()])
+    family('stage_errors_total', 'counter', "Errors recorded by each stage.",
+           [((('stage', stage),), value) for stage, value in errors.items()])
+    family('stage_count', 'gauge', "Counters reported by the last run of each stage.",
+           [((('stage', stage), ('name', name)), value) for (stage, name), value in counts.items()])
+    family('cache_hits', 'gauge', "Cache hits in the last run of each stage.",
+           [((('stage', stage), ('cache', name)), stats['hits']) for (stage, name), stats in cache.items()])
+    family('cache_lookups', 'gauge', "Cache lookups in the last run of each stage.",
+           [((('stage', stage), ('cache', name)), stats['lookups']) for (stage, name), stats in cache.items()])
+    family('last_run_timestamp_seconds', 'gauge', "When the metrics were written.",
+           [((), int(time.time()))])
+    family('run_info', 'gauge', "ID of the run that wrote the metrics (always 1).",
+           [((('run', RUN_ID),), 1)])
+
+    return '\n'.join(lines) + '\n'
+
+def write_metrics(path=None):
+    """Write the Prometheus metrics file, if one was configured."""
+    path = Path(path) if path else _config['metrics_path']
+    if path is None:
+        return None
+    with _lock:
+        content = render_metrics(_metrics)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so a scraper never reads a half-written file
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
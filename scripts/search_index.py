@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Build a prebuilt client-side search index for the published links.
+
+Readers search the catalog in the browser without indexing anything at page
+load: this stage writes an inverted index over the added links of
+temp/categorized.json to assets/search/links-index.json, next to a small
+loader, assets/search/links-search.js.
+
+Indexed terms per link are the tokens of its text, the labels of its host
+(without "www." and the top-level domain) and the tokens of its category's
+ID and name. Links are numbered in page order (category display order, then
+text, as in the snippets) and each term's posting list of link numbers is
+delta-encoded as LEB128 varints and base64'd, so the common terms cost about
+one byte per link:
+
+    {"version": 1, "source_sha256": "...",
+     "categories": [["1.A", "Team Models ..."], ...],
+     "links": [["text", "url", category_number], ...],
+     "terms": ["a11y", "accessibility", ...],
+     "postings": ["AwEH", ...]}
+
+terms are sorted, so the loader finds prefixes by binary search. The index
+is only rebuilt when the set of published links (or category names)
+changes; `source_sha256` records that set.
+
+On a page:
+
+    <script src="{{ '/assets/search/links-search.js' | relative_url }}"></script>
+    LinkSearch.load('{{ '/assets/search/links-index.json' | relative_url }}')
+      .then(index => index.search('design tokens'))
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import sys
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import run_log
+from jekyll_data import write_if_changed
+from keyword_engine import tokenize
+from taxonomy import category_sort_key, load_taxonomy
+
+INDEX_PATH = Path('assets/search/links-index.json')
+LOADER_PATH = Path('assets/search/links-search.js')
+FORMAT_VERSION = 1
+
+LOADER_SCRIPT = """\
+// Loader for the prebuilt link search index written by scripts/search_index.py.
+(function (global) {
+  'use strict';
+
+  var TOKEN_PATTERN = /[\\p{L}\\p{N}]+/gu;
+  var MAX_PREFIX_TERMS = 64;
+
+  function tokenize(text) {
+    return text.toLowerCase().match(TOKEN_PATTERN) || [];
+  }
+
+  // Posting lists are base64'd LEB128 varints of ascending link-number deltas
+  function decodePostings(encoded) {
+    var bytes = global.atob(encoded);
+    var numbers = [];
+    var value = 0, scale = 1, previous = 0;
+    for (var i = 0; i < bytes.length; i++) {
+      var byte = bytes.charCodeAt(i);
+      value += (byte & 0x7f) * scale;
+      if (byte & 0x80) {
+        scale *= 128;
+        continue;
+      }
+      previous += value;
+      numbers.push(previous);
+      value = 0;
+      scale = 1;
+    }
+    return numbers;
+  }
+
+  function lowerBound(terms, term) {
+    var low = 0, high = terms.length;
+    while (low < high) {
+      var middle = (low + high) >>> 1;
+      if (terms[middle] < term) low = middle + 1; else high = middle;
+    }
+    return low;
+  }
+
+  function LinkIndex(data) {
+    this.data = data;
+    this.cache = {};
+  }
+
+  LinkIndex.prototype.postings = function (position) {
+    if (!(position in this.cache)) this.cache[position] = decodePostings(this.data.postings[position]);
+    return this.cache[position];
+  };
+
+  // Link numbers of an exact term, or of every term starting with it
+  LinkIndex.prototype.lookup = function (token, prefix) {
+    var terms = this.data.terms;
+    var position = lowerBound(terms, token);
+    if (!prefix) return terms[position] === token ? this.postings(position) : [];
+    var matches = {};
+    for (var i = position; i < terms.length && i < position + MAX_PREFIX_TERMS
+         && terms[i].lastIndexOf(token, 0) === 0; i++) {
+      this.postings(i).forEach(function (number) { matches[number] = true; });
+    }
+    return Object.keys(matches).map(Number).sort(function (a, b) { return a - b; });
+  };
+
+  // Links matching every query token; the last token matches as a prefix
+  LinkIndex.prototype.search = function (query, limit) {
+    var tokens = tokenize(query);
+    if (!tokens.length) return [];
+    var result = null;
+    for (var i = 0; i < tokens.length && (result === null || result.length); i++) {
+      var numbers = this.lookup(tokens[i], i === tokens.length - 1);
+      if (result === null) {
+        result = numbers;
+      } else {
+        var keep = {};
+        numbers.forEach(function (number) { keep[number] = true; });
+        result = result.filter(function (number) { return keep[number]; });
+      }
+    }
+    var data = this.data;
+    return result.slice(0, limit || 50).map(function (number) {
+      var link = data.links[number];
+      var category = data.categories[link[2]];
+      return {text: link[0], url: link[1], category: category[0], categoryName: category[1]};
+    });
+  };
+
+  global.LinkSearch = {
+    load: function (url) {
+      return global.fetch(url).then(function (response) {
+        if (!response.ok) throw new Error('Could not load ' + url + ': ' + response.status);
+        return response.json();
+      }).then(function (data) { return new LinkIndex(data); });
+    },
+    LinkIndex: LinkIndex
+  };
+})(window);
+"""
+
+def encode_postings(numbers):
+    """Delta-encode ascending link numbers as base64'd LEB128 varints."""
+    encoded = bytearray()
+    previous = 0
+    for number in numbers:
+        delta = number - previous
+        previous = number
+        while delta >= 0x80:
+            encoded.append((delta & 0x7f) | 0x80)
+            delta >>= 7
+        encoded.append(delta)
+    return base64.b64encode(bytes(encoded)).decode('ascii')
+
+def decode_postings(encoded):
+    """Inverse of encode_postings."""
+    numbers = []
+    value = shift = previous = 0
+    for byte in base64.b64decode(encoded):
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        numbers.append(previous)
+        value = shift = 0
+    return numbers
+
+def host_terms(href_norm):
+    """Return the host labels worth searching for: no "www" and no top-level domain."""
+    labels = (urlsplit(href_norm).hostname or '').split('.')
+    if labels and labels[0] == 'www':
+        labels = labels[1:]
+    return [token for label in labels[:-1] for token in tokenize(label)]
+
+def published_links(categorized_links, taxonomy):
+    """Return the added links as (category_id, text, url), in page order."""
+    links = [
+        (link['category'], link['text_final'], link['href_norm'])
+        for link in categorized_links
+        if link['action'] == 'added' and link['category'] in taxonomy
+    ]
+    links.sort(key=lambda link: (category_sort_key(link[0]), link[1].lower()))
+    return links
+
+def build_index(links, taxonomy, source_hash):
+    """Build the index document for published links from published_links()."""
+    category_ids = sorted({category_id for category_id, _, _ in links}, key=category_sort_key)
+    category_numbers = {category_id: number for number, category_id in enumerate(category_ids)}
+    category_terms = {
+        category_id: set(tokenize(category_id)) | set(tokenize(taxonomy.names[category_id]))
+        for category_id in category_ids
+    }
+
+    postings = {}
+    for number, (category_id, text, url) in enumerate(links):
+        for term in set(tokenize(text)) | set(host_terms(url)) | category_terms[category_id]:
+            postings.setdefault(term, []).append(number)
+
+    terms = sorted(postings)
+    return {
+        'version': FORMAT_VERSION,
+        'source_sha256': source_hash,
+        'categories': [[category_id, taxonomy.names[category_id]] for category_id in category_ids],
+        'links': [[text, url, category_numbers[category_id]] for category_id, text, url in links],
+        'terms': terms,
+        'postings': [encode_postings(postings[term]) for term in terms]
+    }
+
+def links_hash(links, taxonomy):
+    """Hash the published link set and the names it is indexed under."""
+    names = sorted({(category_id, taxonomy.names[category_id]) for category_id, _, _ in links})
+    payload = json.dumps([FORMAT_VERSION, names, links], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def indexed_hash(index_path):
+    """Return source_sha256 of an existing index file, or None."""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('source_sha256')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+@run_log.instrument('search')
+def build_search_index(index_path=INDEX_PATH, loader_path=LOADER_PATH, force=False):
+    """Write the search index (if the published links changed) and its loader."""
+    try:
+        categorized_path = Path('temp/categorized.json')
+        if not categorized_path.exists():
+            print("Error: temp/categorized.json not found. Run categorize_links.py first.", file=sys.stderr)
+            sys.exit(1)
+
+        with open(categorized_path, 'r', encoding='utf-8') as f:
+            categorized_links = json.load(f)
+
+        taxonomy = load_taxonomy()
+        links = published_links(categorized_links, taxonomy)
+        source_hash = links_hash(links, taxonomy)
+        index_path = Path(index_path)
+
+        loader_written = write_if_changed(Path(loader_path), LOADER_SCRIPT)
+
+        if not force and indexed_hash(index_path) == source_hash:
+            print(f"Search index up to date ({len(links)} links) - {index_path} left untouched")
+            return {'links': len(links), 'rebuilt': False, 'loader_written': loader_written}
+
+        index = build_index(links, taxonomy, source_hash)
+        content = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        postings_bytes = sum(len(base64.b64decode(encoded)) for encoded in index['postings'])
+        print(f"Built search index for {len(links)} links in {len(index['categories'])} categories")
+        print(f"  - Terms: {len(index['terms'])}, posting bytes: {postings_bytes}")
+        print(f"  - Wrote {index_path} ({len(content.encode('utf-8'))} bytes)")
+        if loader_written:
+            print(f"  - Wrote {loader_path}")
+
+        return {
+            'links': len(links),
+            'terms': len(index['terms']),
+            'postings_bytes': postings_bytes,
+            'index_bytes': len(content.encode('utf-8')),
+            'rebuilt': True,
+            'loader_written': loader_written
+        }
+
+    except Exception as e:
+        run_log.record_error(e)
+        print(f"Fatal error building search index: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Build the client-side search index for published links")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild even if the published links have not changed")
+    args = parser.parse_args(argv)
+
+    build_search_index(force=args.force)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Sharded normalize + categorize for corpora that do not fit in one process.
+
+    designops shard split --shards N     # hash-partition temp/links_raw.csv
+    designops shard work --shard I       # normalize + categorize one shard
+    designops shard merge                # combine shards into the usual outputs
+    designops shard run --shards N --workers W   # all three, W local workers
+
+Raw links are partitioned by a stable hash of their normalized URL, so exact
+duplicates always land in the same shard and each shard can resolve its own
+duplicates (canonical = first occurrence by order_index). Workers only share
+the shard directory, so they can be separate processes or separate machines
+with a shared mount. The merge streams all shards back in order_index order
+and writes temp/links_normalized.json, temp/duplicates.csv and
+temp/categorized.json exactly as the unsharded scripts would, plus the
+summed counters in temp/shards/stats.json.
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import run_log
+
+SHARD_DIR = Path('temp/shards')
+RAW_CSV_PATH = Path('temp/links_raw.csv')
+
+def shard_for(key, shards):
+    """Map a key to a shard number with a hash that is stable across processes."""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+def shard_path(shard_dir, shard, kind):
+    """Path of one shard's file of the given kind (raw, out, dups, stats)."""
+    suffix = 'json' if kind in ('dups', 'stats') else 'jsonl'
+    return Path(shard_dir) / f"shard-{shard:04d}.{kind}.{suffix}"
+
+class JsonArrayWriter:
+    """Stream records into a file formatted like json.dump(records, f, indent=2)."""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def write(self, record):
+        body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        self.f.write(('[\n  ' if self.count == 0 else ',\n  ') + body)
+        self.count += 1
+
+    def close(self):
+        self.f.write('\n]' if self.count else '[]')
+
+def split(shards, shard_dir=SHARD_DIR, raw_path=RAW_CSV_PATH):
+    """Hash-partition raw link records by normalized URL into shard files."""
+    from normalize_links import normalize_url
+
+    if not Path(raw_path).exists():
+        print(f"Error: {raw_path} not found. Run extract_links.py first.", file=sys.stderr)
+        sys.exit(1)
+
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    for stale in shard_dir.glob('shard-*'):
+        stale.unlink()
+
+    outputs = [open(shard_path(shard_dir, i, 'raw'), 'w', encoding='utf-8') for i in range(shards)]
+    counts = Counter()
+    try:
+        with open(raw_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                row['order_index'] = int(row['order_index'])
+                href_norm, _ = normalize_url(row['href_raw'])
+                # Invalid URLs have no normalized form; spread them by raw href
+                shard = shard_for(href_norm if href_norm is not None else row['href_raw'], shards)
+                outputs[shard].write(json.dumps(row, ensure_ascii=False) + '\n')
+                counts[shard] += 1
+    finally:
+        for output in outputs:
+            output.close()
+
+    with open(shard_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump({'shards': shards, 'records': sum(counts.values())}, f, indent=2)
+
+    print(f"Split {sum(counts.values())} links into {shards} shards in {shard_dir}")
+    for shard in range(shards):
+        print(f"  - shard {shard}: {counts[shard]} links")
+    return dict(counts)
+
+@run_log.instrument('shard_work')
+def work(shard, shard_dir=SHARD_DIR):
+    """Normalize and categorize one shard independently."""
+    from categorize_links import categorize_link, load_categories
+    from keyword_engine import KeywordEngine
+    from normalize_links import normalize_url
+
+    raw_file = shard_path(shard_dir, shard, 'raw')
+    if not raw_file.exists():
+        print(f"Error: {raw_file} not found. Run 'designops shard split' first.", file=sys.stderr)
+        sys.exit(1)
+
+    with open(raw_file, 'r', encoding='utf-8') as f:
+        raw_links = [json.loads(line) for line in f]
+    raw_links.sort(key=lambda link: link['order_index'])
+
+    # Normalize and group duplicates within the shard
+    normalized = []
+    url_to_ids = {}
+    for link in raw_links:
+        href_norm, invalid_reason = normalize_url(link['href_raw'])
+        record = {
+            'id': link['id'],
+            'href_raw': link['href_raw'],
+            'href_norm': href_norm,
+            'text_norm': link['text_raw'].strip(),
+            'valid_url': href_norm is not None,
+            'invalid_reason': invalid_reason
+        }
+        normalized.append((link['order_index'], record))
+        if href_norm:
+            url_to_ids.setdefault(href_norm, []).append((link['order_index'], link['id']))
+
+    duplicates = [
+        {'href_norm': href_norm, 'canonical_order_index': ids[0][0], 'ids': [link_id for _, link_id in ids]}
+        for href_norm, ids in url_to_ids.items() if len(ids) > 1
+    ]
+    duplicates_lookup = {dup['href_norm']: dup['ids'][0] for dup in duplicates}
+
+    # Categorize
+    categories = load_categories()
+    engine = KeywordEngine(categories)
+    stats = Counter()
+    with open(shard_path(shard_dir, shard, 'out'), 'w', encoding='utf-8') as f:
+        for order_index, record in normalized:
+            result = categorize_link(record, categories, duplicates_lookup, engine)
+            f.write(json.dumps([order_index, record, result], ensure_ascii=False) + '\n')
+
+            stats['total'] += 1
+            stats['valid' if record['valid_url'] else 'invalid'] += 1
+            if result['action'] == 'added':
+                stats['total_added'] += 1
+                stats[f"added_{result['category']}"] += 1
+            else:
+                stats['total_skipped'] += 1
+                stats[f"skipped_{result['reason'].split(':')[0]}"] += 1
+
+    stats['unique_urls'] = len(url_to_ids)
+    stats['duplicate_urls'] = len(duplicates)
+    stats['duplicate_links'] = sum(len(dup['ids']) - 1 for dup in duplicates)
+
+    with open(shard_path(shard_dir, shard, 'dups'), 'w', encoding='utf-8') as f:
+        json.dump(duplicates, f, ensure_ascii=False)
+    with open(shard_path(shard_dir, shard, 'stats'), 'w', encoding='utf-8') as f:
+        json.dump(dict(stats), f, indent=2)
+
+    print(f"Shard {shard}: {stats['total']} links, {stats['total_added']} added, "
+          f"{stats['duplicate_links']} duplicates")
+    return dict(stats)
+
+def iter_shard_output(path):
+    """Yield (order_index, normalized, categorized) tuples from one shard output."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            order_index, normalized, categorized = json.loads(line)
+            yield order_index, normalized, categorized
+
+@run_log.instrument('shard_merge')
+def merge(shard_dir=SHARD_DIR):
+    """Merge shard outputs into the global pipeline outputs in order_index order."""
+    import link_store
+
+    shard_dir = Path(shard_dir)
+    manifest_path = shard_dir / 'manifest.json'
+    if not manifest_path.exists():
+        print(f"Error: {manifest_path} not found. Run 'designops shard split' first.", file=sys.stderr)
+        sys.exit(1)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        shards = json.load(f)['shards']
+
+    missing = [i for i in range(shards) if not shard_path(shard_dir, i, 'stats').exists()]
+    if missing:
+        print(f"Error: shards not processed yet: {missing}", file=sys.stderr)
+        sys.exit(1)
+
+    # Duplicate groups, in order of each URL's first occurrence
+    duplicates = []
+    stats = Counter()
+    for shard in range(shards):
+        with open(shard_path(shard_dir, shard, 'dups'), 'r', encoding='utf-8') as f:
+            duplicates.extend(json.load(f))
+        with open(shard_path(shard_dir, shard, 'stats'), 'r', encoding='utf-8') as f:
+            stats.update(json.load(f))
+    duplicates.sort(key=lambda dup: dup['canonical_order_index'])
+
+    with open('temp/duplicates.csv', 'w', newline='', encoding='utf-8') as f:
+        fieldnames = ['href_norm', 'canonical_id', 'duplicate_count', 'all_ids', 'match_type']
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for dup in duplicates:
+            writer.writerow({
+                'href_norm': dup['href_norm'],
+                'canonical_id': dup['ids'][0],
+                'duplicate_count': len(dup['ids']),
+                'all_ids': ','.join(dup['ids']),
+                'match_type': 'url'
+            })
+
+    # Stream all shards back in order_index order
+    streams = [iter_shard_output(shard_path(shard_dir, i, 'out')) for i in range(shards)]
+    with open('temp/links_normalized.json', 'w', encoding='utf-8') as normalized_file, \
+         open('temp/categorized.json', 'w', encoding='utf-8') as categorized_file:
+        normalized_writer = JsonArrayWriter(normalized_file)
+        categorized_writer = JsonArrayWriter(categorized_file)
+
+        def merged_categorized():
+            for _, normalized, categorized in heapq.merge(*streams, key=lambda item: item[0]):
+                normalized_writer.write(normalized)
+                categorized_writer.write(categorized)
+                yield categorized
+
+        conn = link_store.connect()
+        try:
+            run_id = link_store.record_run(conn, merged_categorized())
+        finally:
+            conn.close()
+
+        normalized_writer.close()
+        categorized_writer.close()
+
+    with open(shard_dir / 'stats.json', 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(stats.items())), f, indent=2)
+
+    print(f"Merged {shards} shards: {stats['total']} links")
+    print(f"  - Valid URLs: {stats['valid']}, Invalid URLs: {stats['invalid']}")
+    print(f"  - Unique URLs: {stats['unique_urls']}, Duplicate links: {stats['duplicate_links']}")
+    print(f"  - Added: {stats['total_added']}, Skipped: {stats['total_skipped']}")
+    print(f"  - Recorded run {run_id} in {link_store.STORE_PATH}")
+    print("Wrote temp/links_normalized.json, temp/duplicates.csv, temp/categorized.json")
+    return dict(stats)
+
+def run(shards, workers, shard_dir=SHARD_DIR):
+    """Split, process every shard in local worker processes, then merge."""
+    start = time.perf_counter()
+    split(shards, shard_dir)
+
+    cli = Path(__file__).resolve().parent / 'designops.py'
+    # Workers log under this run's ID
+    env = {**os.environ, 'DESIGNOPS_RUN_ID': run_log.RUN_ID}
+
+    def run_worker(shard):
+        return subprocess.run(
+            [sys.executable, str(cli), 'shard', '--dir', str(shard_dir), 'work', '--shard', str(shard)],
+            capture_output=True, text=True, env=env
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run_worker, range(shards)))
+
+    failed = [shard for shard, result in enumerate(results) if result.returncode != 0]
+    for shard, result in enumerate(results):
+        print(result.stdout.strip() if result.returncode == 0 else f"Shard {shard} failed:\n{result.stderr.strip()}")
+    if failed:
+        sys.exit(1)
+
+    stats = merge(shard_dir)
+    print(f"Sharded run finished in {time.perf_counter() - start:.2f}s with {workers} workers")
+    return stats
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Sharded normalize + categorize")
+    parser.add_argument('--dir', default=str(SHARD_DIR),
+                        help=f"shared shard directory (default: {SHARD_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    split_parser = subparsers.add_parser('split', help="hash-partition raw links into shard files")
+    split_parser.add_argument('--shards', type=int, required=True)
+
+    work_parser = subparsers.add_parser('work', help="normalize and categorize one shard")
+    work_parser.add_argument('--shard', type=int, required=True)
+
+    subparsers.add_parser('merge', help="merge shard outputs into the global outputs")
+
+    run_parser = subparsers.add_parser('run', help="split, process with local workers, merge")
+    run_parser.add_argument('--shards', type=int, required=True)
+    run_parser.add_argument('--workers', type=int, default=4)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'split':
+        split(args.shards, args.dir)
+    elif args.command == 'work':
+        work(args.shard, args.dir)
+    elif args.command == 'merge':
+        merge(args.dir)
+    elif args.command == 'run':
+        run(args.shards, args.workers, args.dir)
+
+if __name__ == '__main__':
+    main()
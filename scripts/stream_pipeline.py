@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Pipelined extract -> normalize -> categorize with bounded queues.
+
+    designops stream [--queue-size N] [--batch-size N]
+    designops run --pipelined
+
+The three stages run at the same time as producer/consumer threads:
+
+    extract thread --[raw queue]--> normalize thread --[normalized queue]--> categorize (main thread)
+
+Records travel in small batches through queues holding at most queue_size
+batches, so a fast producer blocks until its consumer catches up and memory
+stays bounded instead of holding a full copy of the corpus at every stage
+boundary. Every stage streams its output files as records arrive
+(temp/links_raw.json/.csv, temp/links_normalized.json, temp/categorized.json)
+and the categorized links are recorded in the link store as they stream by.
+
+Duplicate resolution is incremental: the normalize thread records the first
+occurrence of each normalized URL as its canonical link before passing the
+record on, so categorize can tell a duplicate from a canonical link the
+moment it arrives. Only temp/duplicates.csv waits for the end, since a group
+is complete only after the last link. Outputs are identical to running
+extract_links.py, normalize_links.py and categorize_links.py one after the
+other, apart from the freshly generated link IDs.
+
+Enrichment, fuzzy text de-duplication and checkpoints need the whole corpus
+and are only available in the staged scripts. BeautifulSoup still parses the
+source document in one go; links are streamed from the parsed tree.
+"""
+
+import argparse
+import csv
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import run_log
+
+DONE = object()
+
+class StageFailed(Exception):
+    """An upstream stage thread failed, or the pipeline was cancelled."""
+
+class BoundedChannel:
+    """A bounded queue of record batches with cancellation and backpressure stats."""
+
+    def __init__(self, queue_size, batch_size, stop):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.stop = stop
+        self.batch = []
+        self.blocked_puts = 0
+        self.max_depth = 0
+
+    def _put(self, item):
+        if self.queue.full():
+            self.blocked_puts += 1
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                self.max_depth = max(self.max_depth, self.queue.qsize())
+                return
+            except queue.Full:
+                continue
+        # The pipeline was cancelled; unwind the producer thread
+        raise StageFailed("pipeline cancelled")
+
+    def send(self, record):
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self._put(self.batch)
+            self.batch = []
+
+    def close(self, error=None):
+        """Flush the last batch and signal the end of the stream (or an upstream error)."""
+        if error is None and self.batch:
+            self._put(self.batch)
+            self.batch = []
+        self._put(error if error is not None else DONE)
+
+    def __iter__(self):
+        while True:
+            item = self.queue.get()
+            if item is DONE:
+                return
+            if isinstance(item, BaseException):
+                raise StageFailed(f"{type(item).__name__}: {item}") from item
+            yield from item
+
+def run_thread(target, channel):
+    """Start a daemon thread running target() that always closes channel, passing on any error."""
+    def runner():
+        error = None
+        try:
+            target()
+        except BaseException as e:
+            error = e
+        try:
+            channel.close(error)
+        except StageFailed:
+            # Cancelled downstream: nobody reads the channel any more
+            pass
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    return thread
+
+@run_log.instrument('stream')
+def run_streaming(categories=None, engine=None, url_cache=None, skip_published=False,
+                  queue_size=64, batch_size=64):
+    """Run extract, normalize and categorize concurrently and write their outputs."""
+    from categorize_links import categorize_link, load_categories
+    from extract_links import iter_links, read_source
+    from keyword_engine import KeywordEngine
+    from normalize_links import normalize_url
+    from shard_pipeline import JsonArrayWriter
+    import link_store
+
+    start = time.perf_counter()
+    temp_dir = Path('temp')
+    temp_dir.mkdir(exist_ok=True)
+
+    html_content = read_source()
+    if categories is None:
+        categories = load_categories()
+    if engine is None:
+        engine = KeywordEngine(categories)
+    published = None
+    if skip_published:
+        from published_links import load_published_links
+        published = load_published_links()
+
+    stop = threading.Event()
+    raw_channel = BoundedChannel(queue_size, batch_size, stop)
+    normalized_channel = BoundedChannel(queue_size, batch_size, stop)
+
+    # Shared between the normalize and categorize threads: normalized URL ->
+    # first link ID seen. Entries are written before the record is queued.
+    canonical_ids = {}
+    url_to_ids = defaultdict(list)
+    counts = {'extracted': 0, 'valid': 0, 'invalid': 0}
+
+    def extract():
+        with open(temp_dir / 'links_raw.json', 'w', encoding='utf-8') as json_file, \
+             open(temp_dir / 'links_raw.csv', 'w', newline='', encoding='utf-8') as csv_file:
+            json_writer = JsonArrayWriter(json_file)
+            csv_writer = None
+            for link in iter_links(html_content):
+                json_writer.write(link)
+                if csv_writer is None:
+                    csv_writer = csv.DictWriter(csv_file, fieldnames=['id', 'href_raw', 'text_raw', 'section_hint', 'order_index'])
+                    csv_writer.writeheader()
+                csv_writer.writerow(link)
+                counts['extracted'] += 1
+                raw_channel.send(link)
+            json_writer.close()
+
+    def normalize():
+        with open(temp_dir / 'links_normalized.json', 'w', encoding='utf-8') as f:
+            writer = JsonArrayWriter(f)
+            for link in raw_channel:
+                href_raw = link['href_raw']
+                if url_cache is None:
+                    href_norm, invalid_reason = normalize_url(href_raw)
+                else:
+                    if href_raw not in url_cache:
+                        url_cache[href_raw] = normalize_url(href_raw)
+                    href_norm, invalid_reason = url_cache[href_raw]
+
+                record = {
+                    'id': link['id'],
+                    'href_raw': href_raw,
+                    'href_norm': href_norm,
+                    'text_norm': link['text_raw'].strip(),
+                    'valid_url': href_norm is not None,
+                    'invalid_reason': invalid_reason
+                }
+                writer.write(record)
+                if href_norm:
+                    counts['valid'] += 1
+                    # First occurrence is canonical
+                    canonical_ids.setdefault(href_norm, link['id'])
+                    url_to_ids[href_norm].append(link['id'])
+                else:
+                    counts['invalid'] += 1
+                normalized_channel.send(record)
+            writer.close()
+
+    threads = [run_thread(extract, raw_channel), run_thread(normalize, normalized_channel)]
+
+    stats = defaultdict(int)
+    try:
+        with open(temp_dir / 'categorized.json', 'w', encoding='utf-8') as f:
+            writer = JsonArrayWriter(f)
+
+            def categorized():
+                for record in normalized_channel:
+                    result = categorize_link(record, categories, canonical_ids, engine, published)
+                    writer.write(result)
+                    if result['action'] == 'added':
+                        stats[f"added_{result['category']}"] += 1
+                        stats['total_added'] += 1
+                    else:
+                        stats[f"skipped_{result['reason'].split(':')[0]}"] += 1
+                        stats['total_skipped'] += 1
+                    yield result
+
+            conn = link_store.connect()
+            try:
+                run_id = link_store.record_run(conn, categorized())
+            finally:
+                conn.close()
+            writer.close()
+    except Exception as e:
+        stop.set()
+        run_log.record_error(e)
+        print(f"Fatal error in streaming pipeline: {e}", file=sys.stderr)
+        sys.exit(1)
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for thread in threads:
+            thread.join(timeout=5)
+
+    # Duplicate groups are complete only now
+    duplicates = [(href_norm, ids) for href_norm, ids in url_to_ids.items() if len(ids) > 1]
+    with open(temp_dir / 'duplicates.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['href_norm', 'canonical_id', 'duplicate_count', 'all_ids', 'match_type'])
+        writer.writeheader()
+        for href_norm, ids in duplicates:
+            writer.writerow({
+                'href_norm': href_norm,
+                'canonical_id': ids[0],
+                'duplicate_count': len(ids),
+                'all_ids': ','.join(ids),
+                'match_type': 'url'
+            })
+
+    cache_report = engine.cache_report()
+    run_log.record_cache('url_segments', cache_report['url_segment_cache_hits'], cache_report['url_segment_lookups'])
+    run_log.record_cache('tokens', cache_report['token_cache_hits'], cache_report['token_lookups'])
+    if published is not None:
+        run_log.record_counts(published.stats, prefix='published_')
+
+    elapsed = time.perf_counter() - start
+    result = {
+        'total': counts['extracted'],
+        'valid': counts['valid'],
+        'invalid': counts['invalid'],
+        'unique_urls': len(url_to_ids),
+        'duplicate_links': sum(len(ids) - 1 for _, ids in duplicates),
+        'total_added': stats['total_added'],
+        'total_skipped': stats['total_skipped'],
+        'raw_queue_blocked_puts': raw_channel.blocked_puts,
+        'normalized_queue_blocked_puts': normalized_channel.blocked_puts,
+        'raw_queue_max_depth': raw_channel.max_depth,
+        'normalized_queue_max_depth': normalized_channel.max_depth,
+        'run_id': run_id
+    }
+
+    print(f"Streamed {result['total']} links through extract -> normalize -> categorize in {elapsed:.2f}s")
+    print(f"  - Valid URLs: {result['valid']}, Invalid URLs: {result['invalid']}")
+    print(f"  - Unique URLs: {result['unique_urls']}, Duplicate links: {result['duplicate_links']}")
+    print(f"  - Added: {result['total_added']}, Skipped: {result['total_skipped']}")
+    print(f"  - Queue backpressure: {raw_channel.blocked_puts} raw / {normalized_channel.blocked_puts} normalized "
+          f"blocked puts (max depth {raw_channel.max_depth}/{normalized_channel.max_depth} of {queue_size} batches)")
+    print(f"  - Recorded run {run_id} in {link_store.STORE_PATH}")
+    print("Wrote temp/links_raw.json, temp/links_raw.csv, temp/links_normalized.json, "
+          "temp/duplicates.csv, temp/categorized.json")
+    return result
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Run extract, normalize and categorize as a streaming pipeline")
+    parser.add_argument('--queue-size', type=int, default=64,
+                        help="maximum batches buffered between two stages (default: 64)")
+    parser.add_argument('--batch-size', type=int, default=64,
+                        help="records per queued batch (default: 64)")
+    parser.add_argument('--skip-published', action='store_true',
+                        help="skip links whose URL is already linked from index.md (reason: already_published)")
+    args = parser.parse_args(argv)
+
+    run_streaming(skip_published=args.skip_published, queue_size=args.queue_size, batch_size=args.batch_size)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Shared taxonomy registry compiled from config/categories.yml.
+
+Every stage gets category IDs, names and index.md headings from here instead
+of keeping its own copy. The registry is compiled once into hash maps
+(ID -> heading, heading -> ID, ID -> name) plus ordered ID tuples, memoized
+per process, and persisted to temp/taxonomy_cache.json keyed by the YAML
+file's mtime and size so later processes skip YAML parsing entirely.
+
+A category's heading defaults to "#" * (depth + 1) + " {id} {name}", e.g.
+"### 1.A Team Models (...)" or "#### 2.A.1 Foundations (...)"; set
+`heading:` on a category in the YAML to override it.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+CONFIG_PATH = Path('config/categories.yml')
+CACHE_PATH = Path('temp/taxonomy_cache.json')
+
+def category_sort_key(category_id):
+    """Natural display order key: 1.A < 1.B < 2.A.1 < 2.A.2 < 2.B < 10.A."""
+    return [(0, int(part), '') if part.isdigit() else (1, 0, part) for part in category_id.split('.')]
+
+def default_heading(category_id, name):
+    """Build the index.md heading for a category from its ID and name."""
+    depth = len(category_id.split('.'))
+    return f"{'#' * (depth + 1)} {category_id} {name}"
+
+class Taxonomy:
+    """Compiled category registry."""
+
+    def __init__(self, categories):
+        self.categories = categories
+        # Priority order as listed in the YAML (used for matching)
+        self.priority = tuple(categories.keys())
+        # Display order as the sections appear on the page
+        self.ids = tuple(sorted(categories.keys(), key=category_sort_key))
+        self.names = {category_id: data['name'] for category_id, data in categories.items()}
+        self.headings = {
+            category_id: categories[category_id].get('heading') or default_heading(category_id, self.names[category_id])
+            for category_id in self.ids
+        }
+        self.heading_to_id = {heading: category_id for category_id, heading in self.headings.items()}
+        self.id_set = frozenset(self.ids)
+
+    def __contains__(self, category_id):
+        return category_id in self.id_set
+
+    def __len__(self):
+        return len(self.ids)
+
+    def category_for_heading(self, line):
+        """Return the category ID whose heading matches a (stripped) line, or None."""
+        return self.heading_to_id.get(line.strip())
+
+_memo = {}
+
+def file_signature(path):
+    """Return (mtime_ns, size) of a file."""
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+def load_taxonomy(config_path=CONFIG_PATH, cache_path=CACHE_PATH):
+    """Return the compiled taxonomy, reusing in-process and on-disk caches."""
+    config_path = Path(config_path)
+    if not config_path.exists():
+        print(f"Error: {config_path} not found", file=sys.stderr)
+        sys.exit(1)
+
+    signature = file_signature(config_path)
+    key = str(config_path.resolve())
+    cached = _memo.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    categories = None
+    cache_path = Path(cache_path)
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('source') == key and cache.get('signature') == signature:
+                categories = cache['categories']
+        except (OSError, ValueError):
+            categories = None
+
+    if categories is None:
+        # Imported lazily so stages reading a fresh cache never load PyYAML
+        import yaml
+
+        with open(config_path, 'r', encoding='utf-8') as f:
+            categories = yaml.safe_load(f)['categories']
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'source': key, 'signature': signature, 'categories': categories},
+                          f, indent=2, ensure_ascii=False)
+        except OSError:
+            pass
+
+    taxonomy = Taxonomy(categories)
+    _memo[key] = (signature, taxonomy)
+    return taxonomy
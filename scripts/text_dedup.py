@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Fuzzy de-duplication of links by anchor text.
+
+The same resource often appears under different URLs with near-identical
+text ("Inclusive Components" vs "Inclusive Components – Heydon Pickering").
+A trailing site name after a spaced separator (" - ", " – ", " | ", ...) is
+dropped, the rest is reduced to lowercased letter/digit tokens and split into
+character trigrams. A trigram -> link inverted index generates candidate
+pairs, so only links sharing enough trigrams are ever compared, and each
+candidate is verified with the Jaccard similarity
+
+    |trigrams(a) & trigrams(b)| / |trigrams(a) | trigrams(b)|
+
+against a threshold.
+
+Only a short prefix of each text's trigrams is indexed and probed: trigrams
+are ordered rarest first, and two sets with Jaccard >= t must share one of
+the first |a| - ceil(t * |a|) + 1 trigrams of each (prefix filtering), so
+very common trigrams ("des", "ign", ...) are never used to generate
+candidates and the work stays close to linear without missing any pair.
+Texts shorter than min_length characters
+are ignored, since short labels ("Home", "Medium") say nothing about the
+resource.
+
+Matched links are grouped transitively; the first link of a group (by input
+order) is canonical. Used by normalize_links.py --text-dedup, which reports
+the groups in temp/duplicates.csv with match_type "text".
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from keyword_engine import tokenize
+
+SITE_SUFFIX_PATTERN = re.compile(r'\s+[-–—|·•:]\s+')
+
+def text_key(text):
+    """Reduce link text to lowercased letter/digit tokens, without a trailing site name."""
+    title = SITE_SUFFIX_PATTERN.split(text, maxsplit=1)[0]
+    return ' '.join(tokenize(title)) or ' '.join(tokenize(text))
+
+def trigrams(key):
+    """Return the set of character trigrams of a text key, padded at the ends."""
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def find_text_duplicates(links, threshold=0.8, min_length=12):
+    """Group links whose text_norm is near-identical.
+
+    Returns (groups, stats): groups is a list of lists of positions into
+    links (canonical first, groups ordered by canonical position); stats
+    counts the candidate pairs generated and verified.
+    """
+    grams = []
+    for link in links:
+        key = text_key(link['text_norm'])
+        grams.append(trigrams(key) if len(key) >= min_length else None)
+
+    # Global trigram order, rarest first
+    document_frequency = Counter(gram for link_grams in grams if link_grams for gram in link_grams)
+    rank = {gram: i for i, gram in enumerate(sorted(document_frequency, key=lambda gram: (document_frequency[gram], gram)))}
+
+    parent = list(range(len(links)))
+
+    def find(position):
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    index = defaultdict(list)
+    stats = Counter(candidate_pairs=0, verified_pairs=0)
+
+    for i, link_grams in enumerate(grams):
+        if not link_grams:
+            continue
+
+        size = len(link_grams)
+        prefix_length = size - math.ceil(round(threshold * size, 9)) + 1
+        candidates = set()
+        for gram in sorted(link_grams, key=rank.__getitem__)[:prefix_length]:
+            candidates.update(index[gram])
+            index[gram].append(i)
+
+        for j in candidates:
+            other_size = len(grams[j])
+            # Sets of very different sizes cannot reach the threshold
+            if min(size, other_size) < threshold * max(size, other_size):
+                continue
+            stats['candidate_pairs'] += 1
+            # Jaccard >= threshold  <=>  |a & b| * (1 + threshold) >= threshold * (|a| + |b|)
+            if len(link_grams & grams[j]) * (1 + threshold) >= threshold * (size + other_size):
+                stats['verified_pairs'] += 1
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    # Keep the earliest link as the root (canonical)
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    members = defaultdict(list)
+    for position, link_grams in enumerate(grams):
+        if link_grams:
+            members[find(position)].append(position)
+
+    groups = [positions for root, positions in sorted(members.items()) if len(positions) > 1]
+    stats['indexed_texts'] = sum(1 for link_grams in grams if link_grams)
+    return groups, dict(stats)
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Differential check of the optimized engines against the reference path.
+
+    designops verify [--size N] [--seed S] [--engines a,b] [--shards N --workers W]
+
+normalize_url() and categorize_link() without an engine (the keyword scan
+of match_keywords) are the reference implementations. This harness builds
+two corpora as a .source.html page:
+
+  random       links mixing keywords from config/categories.yml with odd
+               Unicode, HTML entities, tracking parameters, fragments,
+               invalid schemes and re-posted (duplicate) URLs
+  adversarial  every keyword in boundary positions: inside longer words,
+               across URL/text and "/" boundaries, in other case, next to
+               underscores and digits, plus keyword pairs from different
+               categories (priority conflicts)
+
+It extracts the links once, runs the reference normalize and categorize
+over them, then runs every registered engine on the same input and
+compares the records one by one (link IDs are compared through each link's
+order_index, since the pipelined mode generates its own). Engines that run
+whole stages (shard, stream) run in a scratch directory with a copy of
+config/categories.yml and config/canonicalization.yml, so temp/ is never
+touched. The canonicalization engine compares the compiled host tables of
+canonicalization.py with a scan over every host rule, on the corpus URLs
+plus aliases, subdomains and look-alikes of each host, for the rule file
+and for a synthetic rule set with nested wildcards and alias chains. Since
+both implementations share the rule semantics, it also checks that every
+canonicalized URL is a fixed point: canonicalizing it again changes
+nothing (an alias host must end up with its canonical host's rules).
+
+The report lists mismatches per engine and its throughput against the
+reference stages it replaces. Exits with status 1 on any mismatch.
+"""
+
+import argparse
+import contextlib
+import csv
+import html
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCHEMES = ['https', 'http', 'HTTPS', 'Http']
+HOSTS = [
+    'example.com', 'www.nngroup.com', 'Medium.com', 'material.io', 'codepen.io',
+    'bücher.de', 'xn--bcher-kva.de', 'sub.domain.co.uk', 'localhost:8080',
+    'user:pw@host.io', '127.0.0.1', 'EXAMPLE.org', 'M.YouTube.com', 'blog.medium.com',
+    'every-layout.dev', 'smashingmagazine.com:443'
+]
+FILLER_WORDS = ['guide', 'the', 'how', 'to', 'team', 'ops', 'notes', 'tips', '2024', 'v2', 'index', 'blog']
+QUERIES = [
+    '', 'a=1', 'a=1&b=2', 'a=&b=2', '123', 'q=design+ops', 'q=%E2%9C%93', 'a=1&a=2',
+    'x=%26y', 'page=2&utm_source=feed', 'utm_source=news&utm_medium=email', 'gclid=abc',
+    'fbclid=1&id=7', 'mc_cid=2&mc_eid=3', 'ref=hn;x=1', 'ref=producthunt', 'source=rss&sk=2',
+    'amp', 'a=%20&utm_%63ampaign=x'
+]
+# Host prefixes and suffixes that canonicalization rules must (not) match
+HOST_VARIANTS = ['{}', 'www.{}', 'm.{}', 'a.b.{}', 'x{}', '{}.evil', '{}:8080', 'user@{}']
+PATH_VARIANTS = ['', '/amp', '/2020/01/post/amp', '/amp/page', '/a']
+# Nested wildcards and mixed-case keys the shipped rule file may not have
+SYNTHETIC_RULES = {
+    'drop_params': ['utm_*', 'x*', 'gclid'],
+    'hosts': {
+        '*.example.com': {'drop_params': ['a']},
+        '*.sub.example.com': {'host': 'sub.example.com', 'drop_params': ['b']},
+        'deep.sub.example.com': {'path_rewrites': [{'pattern': '^/a$', 'replace': '/b'}]},
+        '*.co.uk': {'drop_params': ['q']},
+        '*.domain.co.uk': {'path_rewrites': [{'pattern': '/amp(/|$)', 'replace': '/'}]},
+        'EXAMPLE.org': {'host': 'www.example.org'},
+        'www.example.org': {'drop_params': ['b'], 'path_rewrites': [{'pattern': '/amp$', 'replace': ''}]},
+        'm.example.net': {'host': 'example.net'},
+        'example.net': {'host': 'WWW.example.net'},
+        '*.example.net': {'drop_params': ['a']},
+        'www.example.net': {'path_rewrites': [{'pattern': '^/amp(/|$)', 'replace': '/'}]},
+        'loop-a.test': {'host': 'loop-b.test', 'drop_params': ['a']},
+        'loop-b.test': {'host': 'loop-a.test', 'drop_params': ['b']},
+        '*.io': {'drop_params': ['ref']},
+        'localhost': {'host': '127.0.0.1'}
+    }
+}
+FRAGMENTS = ['', '#top', '#', '#section-2']
+INVALID_HREFS = [
+    'htp://example.com', 'htps://x.io/a', 'https:/example.com', 'http//example.com',
+    'ftp://files.example.com/a', 'mailto:hi@example.com', 'javascript:void(0)',
+    '//cdn.example.com/x.js', '/relative/path', '#anchor', 'http://[::1', 'https://'
+]
+# Characters that differ between naive and Unicode-aware case folding or tokenizing
+UNICODE_NOISE = [
+    '\u00a0', '\u200b', '\u0301', '\u0130', '\u00df', '\uff43\uff4f\uff4c\uff4f\uff52', '\u212a',
+    '\u00e9', '\U0001f3a8', '\u2013', '&amp;', '&lt;b&gt;', '\u01c4', '_', '-', '/', '.', '\u2019'
+]
+# Spaces inside multi-word keywords are replaced by one of these in URLs
+SLUG_SEPARATORS = ['-', '%20', '_', '+']
+WORD_NEAR_MISSES = [
+    'variable', 'Aria-Label', 'ARIA', 'aria_label', 'grids', 'gridlock', 'grid-template',
+    'fonts', 'fontawesome', 'font-size', 'colorado', 'subcolour'
+]
+
+def keyword_strings(categories):
+    """Return every keyword of every category, in priority order."""
+    from keyword_engine import keyword_spec
+
+    return [
+        (category_id, *keyword_spec(entry))
+        for category_id, data in categories.items()
+        for entry in data.get('keywords', [])
+    ]
+
+def vary_case(rng, text):
+    """Return text in a random letter case."""
+    return rng.choice([str.lower, str.upper, str.title, str.swapcase, lambda value: value])(text)
+
+def slug(text):
+    """Turn a keyword into a URL path segment."""
+    return text.replace(' ', SLUG_SEPARATORS[len(text) % len(SLUG_SEPARATORS)])
+
+def random_text(rng, keywords):
+    """Return link text mixing keywords, filler words and Unicode noise."""
+    parts = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(0, 3))]
+    for _ in range(rng.choice([0, 1, 1, 2, 3])):
+        keyword = vary_case(rng, rng.choice(keywords)[1])
+        if rng.random() < 0.2:
+            # Glue the keyword into a longer word
+            keyword = rng.choice(['x', 'pre', '2', '_']) + keyword + rng.choice(['s', 'ed', '9', '_', ''])
+        parts.insert(rng.randint(0, len(parts)), keyword)
+    for _ in range(rng.choice([0, 0, 1, 2])):
+        parts.insert(rng.randint(0, len(parts)), rng.choice(UNICODE_NOISE))
+    if rng.random() < 0.05:
+        parts.append(rng.choice(WORD_NEAR_MISSES))
+    return rng.choice([' ', ' ', '  ', ' - ', '\n    ']).join(parts)
+
+def random_href(rng, keywords):
+    """Return a URL with keyword path segments, tracking parameters and fragments, or an invalid one."""
+    if rng.random() < 0.08:
+        return rng.choice(INVALID_HREFS)
+    segments = []
+    for _ in range(rng.randint(0, 4)):
+        if rng.random() < 0.4:
+            segments.append(slug(vary_case(rng, rng.choice(keywords)[1])))
+        else:
+            segments.append(rng.choice(FILLER_WORDS + ['a%2Fb', 'caf%C3%A9', 'été', '']))
+    path = '/' + '/'.join(segments) if segments else ''
+    if rng.random() < 0.3:
+        path += '/'
+    query = rng.choice(QUERIES)
+    href = f"{rng.choice(SCHEMES)}://{rng.choice(HOSTS)}{path}"
+    if query:
+        href += '?' + query
+    href += rng.choice(FRAGMENTS)
+    if rng.random() < 0.1:
+        href = rng.choice([' ', '\n', '\t']) + href + rng.choice(['', ' ', '\n'])
+    if rng.random() < 0.05:
+        href = href.replace('&', '&amp;')
+    return href
+
+def repost(rng, href):
+    """Return a variant of an earlier href that normalizes to the same URL (usually)."""
+    variants = [
+        href,
+        href + rng.choice(['#again', '']),
+        href.replace('https://', 'HTTPS://', 1),
+        href + ('&' if '?' in href else '?') + 'utm_source=repost',
+        href.rstrip('/') + '/' if '?' not in href and '#' not in href else href
+    ]
+    return rng.choice(variants)
+
+def random_corpus(size, seed, categories):
+    """Return [(href, text)] with random keyword mixtures and duplicates."""
+    rng = random.Random(seed)
+    keywords = keyword_strings(categories)
+    links = []
+    for _ in range(size):
+        if links and rng.random() < 0.15:
+            href = repost(rng, rng.choice(links)[0])
+        else:
+            href = random_href(rng, keywords)
+        links.append((href, random_text(rng, keywords)))
+    return links
+
+def adversarial_corpus(seed, categories):
+    """Return [(href, text)] putting every keyword at match boundaries."""
+    from keyword_engine import MATCH_WORD
+
+    rng = random.Random(seed)
+    keywords = keyword_strings(categories)
+    links = []
+    for category_id, keyword, mode in keywords:
+        lowered = keyword.lower()
+        links.extend([
+            ('https://example.com/page', keyword),
+            ('https://example.com/page', keyword.upper()),
+            ('https://example.com/page', f"x{keyword}y"),
+            ('https://example.com/page', f"_{keyword}_ 9{keyword}9"),
+            ('https://example.com/page', f"{keyword}-{keyword}"),
+            (f"https://example.com/{slug(lowered)}/", 'unrelated words'),
+            (f"https://example.com/docs?topic={slug(lowered)}", 'unrelated words'),
+            ('https://example.com/page', keyword.replace(' ', '\u00a0')),
+            ('https://example.com/page', keyword.replace(' ', '\n  ')),
+        ])
+        if lowered.replace('.', '').replace('-', '').isalnum():
+            links.append((f"https://{lowered}.example.com", 'home'))
+            links.append((f"https://www.example.com/{lowered}", 'home'))
+        if ' ' in keyword:
+            # Split across the URL/text join of "{href_norm} {text_norm}"
+            head, tail = keyword.split(' ', 1)
+            links.append((f"https://example.com/read/{head}", f"{tail} explained"))
+            links.append((f"https://example.com/read/{head}/", f"{tail} explained"))
+        if '/' in keyword:
+            head, tail = keyword.split('/', 1)
+            links.append((f"https://{head}/{tail}", 'link'))
+            links.append(('https://example.com/page', keyword))
+        if mode == MATCH_WORD:
+            links.extend(('https://example.com/page', f"{keyword}{suffix}") for suffix in ['s', '1', '_x', '-x', 'é'])
+
+    links.extend(('https://example.com/page', near_miss) for near_miss in WORD_NEAR_MISSES)
+
+    # Priority conflicts: keywords of two categories in one link, both orders
+    by_category = {}
+    for category_id, keyword, _ in keywords:
+        by_category.setdefault(category_id, []).append(keyword)
+    category_ids = list(by_category)
+    for _ in range(len(category_ids) * 20):
+        first, second = rng.sample(category_ids, 2)
+        a, b = rng.choice(by_category[first]), rng.choice(by_category[second])
+        links.append((f"https://example.com/{slug(a.lower())}", b))
+        links.append((f"https://example.com/{slug(b.lower())}", a))
+        links.append(('https://example.com/page', f"{a} {b}"))
+        links.append(('https://example.com/page', f"{b} {a}"))
+
+    # The same links reposted with tracking parameters and fragments
+    links.extend((repost(rng, href), text) for href, text in rng.sample(links, len(links) // 10))
+    return links
+
+def render_html(sections):
+    """Render {section name: [(href, text)]} as a source page like .source.html."""
+    lines = ['<!DOCTYPE html>', '<html><head><meta charset="utf-8"></head><body>']
+    for name, links in sections.items():
+        lines.append(f"<h2>{html.escape(name)}</h2>")
+        lines.append('<ul>')
+        for href, text in links:
+            lines.append(f'<li><a href="{html.escape(href)}">{html.escape(text, quote=False)}</a></li>')
+        lines.append('</ul>')
+    lines.append('</body></html>')
+    return '\n'.join(lines)
+
+def normalize_record(link, href_norm, invalid_reason):
+    """Build a normalized record exactly as normalize_links.py does."""
+    return {
+        'id': link['id'],
+        'href_raw': link['href_raw'],
+        'href_norm': href_norm,
+        'text_norm': link['text_raw'].strip(),
+        'valid_url': href_norm is not None,
+        'invalid_reason': invalid_reason
+    }
+
+def first_occurrences(normalized):
+    """Return href_norm -> canonical ID for URLs seen more than once."""
+    ids = {}
+    for record in normalized:
+        if record['href_norm']:
+            ids.setdefault(record['href_norm'], []).append(record['id'])
+    return {href_norm: link_ids[0] for href_norm, link_ids in ids.items() if len(link_ids) > 1}
+
+class Corpus:
+    """One source page and the reference outputs for its links."""
+
+    def __init__(self, name, source_html, categories):
+        from categorize_links import categorize_link
+        from extract_links import iter_links
+        from normalize_links import normalize_url
+
+        self.name = name
+        self.html = source_html
+        self.categories = categories
+        self.timings = {}
+
+        start = time.perf_counter()
+        self.raw = list(iter_links(source_html))
+        self.timings['extract'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.normalized = [normalize_record(link, *normalize_url(link['href_raw'])) for link in self.raw]
+        self.timings['normalize'] = time.perf_counter() - start
+
+        self.duplicates_lookup = first_occurrences(self.normalized)
+        start = time.perf_counter()
+        self.categorized = [
+            categorize_link(record, categories, self.duplicates_lookup) for record in self.normalized
+        ]
+        self.timings['categorize'] = time.perf_counter() - start
+
+    def __len__(self):
+        return len(self.raw)
+
+def comparable(records, id_to_order):
+    """Replace link IDs (also inside duplicate_of reasons) with order_index."""
+    result = []
+    for record in records:
+        record = dict(record)
+        record['id'] = id_to_order.get(record['id'], record['id'])
+        reason = record.get('reason')
+        if reason and reason.startswith('duplicate_of:'):
+            canonical_id = reason.split(':', 1)[1]
+            record['reason'] = f"duplicate_of:#{id_to_order.get(canonical_id, canonical_id)}"
+        result.append(record)
+    return result
+
+def diff_records(expected, actual, id_to_expected, id_to_actual, kind, limit):
+    """Return (mismatch count, [descriptions of the first mismatches])."""
+    expected = comparable(expected, id_to_expected)
+    actual = comparable(actual, id_to_actual)
+    details = []
+    mismatches = abs(len(expected) - len(actual))
+    if mismatches:
+        details.append(f"{kind}: {len(actual)} records, expected {len(expected)}")
+    for position, (want, got) in enumerate(zip(expected, actual)):
+        if want == got:
+            continue
+        mismatches += 1
+        if len(details) < limit:
+            fields = sorted(key for key in set(want) | set(got) if want.get(key) != got.get(key))
+            changes = ', '.join(f"{key}: {want.get(key)!r} != {got.get(key)!r}" for key in fields)
+            details.append(f"{kind} #{position}: {changes}")
+    return mismatches, details
+
+@contextlib.contextmanager
+def scratch_directory(corpus, raw_files=False):
+    """Run stage functions in a throwaway copy of the inputs they read."""
+    import canonicalization
+    from taxonomy import CONFIG_PATH
+
+    previous = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix='designops-verify-') as root:
+        root = Path(root)
+        (root / CONFIG_PATH).parent.mkdir(parents=True)
+        for config_path in (CONFIG_PATH, canonicalization.CONFIG_PATH):
+            if (previous / config_path).exists():
+                shutil.copy(previous / config_path, root / config_path)
+        (root / 'temp').mkdir()
+        (root / '.source.html').write_text(corpus.html, encoding='utf-8')
+        if raw_files:
+            with open(root / 'temp/links_raw.json', 'w', encoding='utf-8') as f:
+                json.dump(corpus.raw, f, ensure_ascii=False)
+            with open(root / 'temp/links_raw.csv', 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['id', 'href_raw', 'text_raw', 'section_hint', 'order_index'])
+                writer.writeheader()
+                writer.writerows(corpus.raw)
+        os.chdir(root)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield root
+        finally:
+            os.chdir(previous)
+
+def read_outputs():
+    """Read links_raw/normalized/categorized from temp/ of the current directory."""
+    outputs = []
+    for name in ('links_raw', 'links_normalized', 'categorized'):
+        with open(Path('temp') / f"{name}.json", 'r', encoding='utf-8') as f:
+            outputs.append(json.load(f))
+    return outputs
+
+# Engine name -> (function, reference stages it replaces, description)
+ENGINES = {}
+
+def engine(name, replaces, description):
+    """Register an engine check: function(corpus, options) -> result dict."""
+    def register(function):
+        ENGINES[name] = (function, replaces, description)
+        return function
+    return register
+
+@engine('keyword_engine', ['categorize'], "KeywordEngine token index vs the keyword scan")
+def check_keyword_engine(corpus, options):
+    from categorize_links import categorize_link
+    from keyword_engine import KeywordEngine
+
+    start = time.perf_counter()
+    keyword_engine = KeywordEngine(corpus.categories)
+    categorized = [
+        categorize_link(record, corpus.categories, corpus.duplicates_lookup, keyword_engine)
+        for record in corpus.normalized
+    ]
+    return {'seconds': time.perf_counter() - start, 'categorized': categorized}
+
+@engine('memoized_normalize', ['normalize'], "normalize_url memoized by raw href (warm cache, as in watch)")
+def check_memoized_normalize(corpus, options):
+    from normalize_links import normalize_url
+
+    url_cache = {}
+
+    def normalize_all():
+        records = []
+        for link in corpus.raw:
+            href_raw = link['href_raw']
+            if href_raw not in url_cache:
+                url_cache[href_raw] = normalize_url(href_raw)
+            records.append(normalize_record(link, *url_cache[href_raw]))
+        return records
+
+    cold = normalize_all()
+    start = time.perf_counter()
+    warm = normalize_all()
+    seconds = time.perf_counter() - start
+    # Both passes must match: the cold one fills the cache, the warm one only reads it
+    return {'seconds': seconds, 'normalized': warm, 'extra': {'normalized (cold cache)': cold}}
+
+@engine('shard', ['normalize', 'categorize'], "shard_pipeline run: split, worker processes, merge")
+def check_shard(corpus, options):
+    import shard_pipeline
+
+    with scratch_directory(corpus, raw_files=True):
+        start = time.perf_counter()
+        shard_pipeline.run(options.shards, options.workers, Path('temp/shards'))
+        seconds = time.perf_counter() - start
+        _, normalized, categorized = read_outputs()
+    return {'seconds': seconds, 'normalized': normalized, 'categorized': categorized}
+
+@engine('stream', ['extract', 'normalize', 'categorize'], "stream_pipeline: concurrent stages, bounded queues")
+def check_stream(corpus, options):
+    import stream_pipeline
+
+    with scratch_directory(corpus):
+        start = time.perf_counter()
+        stream_pipeline.run_streaming()
+        seconds = time.perf_counter() - start
+        raw, normalized, categorized = read_outputs()
+    comparable_raw = [{key: value for key, value in link.items() if key != 'id'} for link in raw]
+    expected_raw = [{key: value for key, value in link.items() if key != 'id'} for link in corpus.raw]
+    result = {
+        'seconds': seconds,
+        'normalized': normalized,
+        'categorized': categorized,
+        'id_to_order': {link['id']: link['order_index'] for link in raw}
+    }
+    if comparable_raw != expected_raw:
+        result['errors'] = ["extracted links differ from the reference extraction"]
+    return result
+
+@engine('canonicalization', [], "canonicalization host tables vs a scan over every host rule")
+def check_canonicalization(corpus, options):
+    from urllib.parse import urlsplit
+
+    import canonicalization
+
+    components = []
+    for link in corpus.raw:
+        try:
+            parsed = urlsplit(html.unescape(link['href_raw'].strip()))
+        except ValueError:
+            continue
+        if parsed.netloc:
+            components.append((parsed.netloc.lower(), parsed.path.rstrip('/'), parsed.query))
+    rule_sets = [('configured', canonicalization.load_rules()), ('synthetic', SYNTHETIC_RULES)]
+    for _, rules in rule_sets:
+        for key in rules['hosts']:
+            host = key.lower()[2:] if key.startswith('*.') else key.lower()
+            for variant in HOST_VARIANTS:
+                for path in PATH_VARIANTS:
+                    components.extend((variant.format(host), path, query) for query in QUERIES)
+
+    def records(apply):
+        return [
+            dict(zip(('id', 'netloc', 'path', 'query'), (f"url #{position}",) + apply(*url)))
+            for position, url in enumerate(components)
+        ]
+
+    result = {'seconds': 0.0, 'reference_seconds': 0.0, 'compare': []}
+    for name, rules in rule_sets:
+        start = time.perf_counter()
+        expected = records(lambda *url: canonicalization.reference_apply(rules, *url))
+        result['reference_seconds'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        canonicalizer = canonicalization.Canonicalizer(rules)
+        actual = records(canonicalizer.apply)
+        result['seconds'] += time.perf_counter() - start
+        result['compare'].append((f"canonicalized ({name} rules)", actual, expected))
+
+        def in_cycle(host):
+            last_host, last_rule = canonicalizer.rules_for(host)[-1]
+            return last_rule.host not in (None, last_host)
+
+        # Hosts in an alias cycle have no canonical form; every other result must be a fixed point
+        for record in actual:
+            url = (record['netloc'], record['path'], record['query'])
+            if in_cycle(canonicalization.split_netloc(url[0])[1]):
+                continue
+            again = canonicalizer.apply(*url)
+            if again != url and len(result.setdefault('errors', [])) < options.show:
+                result['errors'].append(f"{name} rules: {record['id']} {url} is not canonical, "
+                                        f"canonicalizes again to {again}")
+    return result
+
+def run_engine(name, corpus, options):
+    """Run one engine on a corpus and compare it with the reference records."""
+    function, replaces, _ = ENGINES[name]
+    try:
+        result = function(corpus, options)
+    except (Exception, SystemExit) as e:
+        return {'engine': name, 'corpus': corpus.name, 'mismatches': None,
+                'details': [f"engine failed: {type(e).__name__}: {e}"]}
+
+    reference_order = {link['id']: link['order_index'] for link in corpus.raw}
+    id_to_order = result.get('id_to_order', reference_order)
+    mismatches = 0
+    details = list(result.get('errors', []))
+    mismatches += len(details)
+
+    outputs = [('normalized', result.get('normalized'), corpus.normalized),
+               ('categorized', result.get('categorized'), corpus.categorized)]
+    outputs.extend((kind, records, corpus.normalized if 'normalized' in kind else corpus.categorized)
+                   for kind, records in result.get('extra', {}).items())
+    outputs.extend(result.get('compare', []))
+    for kind, records, expected in outputs:
+        if records is None:
+            continue
+        count, found = diff_records(expected, records, reference_order, id_to_order, kind,
+                                    options.show - len(details))
+        mismatches += count
+        details.extend(found)
+
+    reference_seconds = result.get('reference_seconds', sum(corpus.timings[stage] for stage in replaces))
+    return {
+        'engine': name,
+        'corpus': corpus.name,
+        'links': len(corpus),
+        'mismatches': mismatches,
+        'details': details,
+        'reference_seconds': reference_seconds,
+        'seconds': result['seconds'],
+        'speedup': reference_seconds / result['seconds'] if result['seconds'] else float('inf')
+    }
+
+def build_corpora(size, seed, categories):
+    """Build the random and adversarial corpora with their reference outputs."""
+    random_links = random_corpus(size, seed, categories)
+    adversarial_links = adversarial_corpus(seed, categories)
+    # Section names exercise section_hint tracking in extraction as well
+    chunk = max(1, len(random_links) // 10)
+    random_sections = {f"Section {i // chunk} – Ünïcode &": random_links[i:i + chunk]
+                       for i in range(0, len(random_links), chunk)}
+    return [
+        Corpus('random', render_html(random_sections), categories),
+        Corpus('adversarial', render_html({'Adversarial': adversarial_links}), categories)
+    ]
+
+def verify_engines(engines=None, size=20000, seed=0, shards=4, workers=4, show=5):
+    """Compare every engine with the reference on both corpora; return the results."""
+    from categorize_links import load_categories
+
+    options = argparse.Namespace(shards=shards, workers=workers, show=show)
+    engines = engines or list(ENGINES)
+    categories = load_categories()
+
+    print(f"Building corpora (seed {seed}) and reference outputs...")
+    corpora = build_corpora(size, seed, categories)
+    for corpus in corpora:
+        timings = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in corpus.timings.items())
+        print(f"  - {corpus.name}: {len(corpus)} links (reference: {timings})")
+
+    results = []
+    print(f"\n{'engine':<20} {'corpus':<12} {'links':>7} {'mismatches':>10} {'reference':>10} {'engine':>9} {'speedup':>8}")
+    for name in engines:
+        for corpus in corpora:
+            result = run_engine(name, corpus, options)
+            results.append(result)
+            if result['mismatches'] is None:
+                print(f"{name:<20} {corpus.name:<12} {len(corpus):>7} {'FAILED':>10}")
+            else:
+                status = '✅' if result['mismatches'] == 0 else '❌'
+                print(f"{name:<20} {corpus.name:<12} {len(corpus):>7} {result['mismatches']:>10} "
+                      f"{result['reference_seconds']:>9.3f}s {result['seconds']:>8.3f}s "
+                      f"{result['speedup']:>7.2f}x {status}")
+            for detail in result['details']:
+                print(f"    {detail}")
+    return results
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Check optimized engines against the reference normalize/categorize")
+    parser.add_argument('--size', type=int, default=20000,
+                        help="links in the random corpus (default: 20000)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="random seed for both corpora (default: 0)")
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help=f"comma-separated engines to check (default: {','.join(ENGINES)})")
+    parser.add_argument('--shards', type=int, default=4,
+                        help="shards for the shard engine (default: 4)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="worker processes for the shard engine (default: 4)")
+    parser.add_argument('--show', type=int, default=5,
+                        help="mismatches to print per engine and corpus (default: 5)")
+    args = parser.parse_args(argv)
+
+    engines = [name.strip() for name in args.engines.split(',') if name.strip()]
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)}")
+
+    results = verify_engines(engines, args.size, args.seed, args.shards, args.workers, args.show)
+    failed = [result for result in results if result['mismatches'] != 0]
+    if failed:
+        print(f"\n❌ {len(failed)} engine/corpus combinations differ from the reference")
+        sys.exit(1)
+    print("\n✅ All engines match the reference record by record")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Watch pipeline inputs and re-run only the stages that depend on them.
+Keeps parsed state (category rules, normalized-URL cache, index.md section map)
+warm in memory so each update runs in-process instead of one process per script.
+
+Watched inputs and the stages they trigger:
+  .source.html           -> extract, normalize, categorize, snippets, search, dry-run, QA
+  config/categories.yml  -> categorize, snippets, search, dry-run, QA
+  config/canonicalization.yml -> normalize, categorize, snippets, search, dry-run, QA
+  index.md               -> dry-run
+
+Uses inotify when the optional inotify_simple package is installed and falls
+back to polling file signatures otherwise.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from pipeline import STAGE_ORDER, PipelineState
+
+SOURCE_PATH = Path('.source.html')
+CATEGORIES_PATH = Path('config/categories.yml')
+CANONICALIZATION_PATH = Path('config/canonicalization.yml')
+INDEX_PATH = Path('index.md')
+
+# Stages that must re-run when each watched input changes
+DEPENDENT_STAGES = {
+    SOURCE_PATH: {'extract', 'normalize', 'categorize', 'snippets', 'search', 'dry_run', 'qa'},
+    CATEGORIES_PATH: {'categorize', 'snippets', 'search', 'dry_run', 'qa'},
+    CANONICALIZATION_PATH: {'normalize', 'categorize', 'snippets', 'search', 'dry_run', 'qa'},
+    INDEX_PATH: {'dry_run'},
+}
+
+def affected_stages(changed_paths):
+    """Return the stages to re-run for a set of changed inputs, in pipeline order."""
+    stages = set()
+    for path in changed_paths:
+        stages |= DEPENDENT_STAGES.get(path, set())
+    return [stage for stage in STAGE_ORDER if stage in stages]
+
+def file_signature(path):
+    """Return (mtime_ns, size) for a path, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class PollingWatcher:
+    """Detect changes by polling file signatures."""
+
+    def __init__(self, paths, interval=0.25):
+        self.interval = interval
+        self.signatures = {path: file_signature(path) for path in paths}
+
+    def wait(self):
+        """Block until at least one watched file changes and return the changed paths."""
+        while True:
+            time.sleep(self.interval)
+            changed = set()
+            for path, signature in self.signatures.items():
+                current = file_signature(path)
+                if current != signature:
+                    self.signatures[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+
+class InotifyWatcher:
+    """Detect changes with inotify (requires the inotify_simple package)."""
+
+    def __init__(self, paths, settle_ms=50):
+        from inotify_simple import INotify, flags
+
+        self.settle_ms = settle_ms
+        self.inotify = INotify()
+        self.targets = {}
+        # Watch parent directories so editors that save via rename are still seen
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+        for path in paths:
+            parent = path.parent if str(path.parent) else Path('.')
+            wd = self.inotify.add_watch(str(parent), mask)
+            self.targets[(wd, path.name)] = path
+
+    def wait(self):
+        """Block until at least one watched file changes and return the changed paths."""
+        while True:
+            events = self.inotify.read(read_delay=self.settle_ms)
+            changed = {self.targets[(event.wd, event.name)] for event in events
+                       if (event.wd, event.name) in self.targets}
+            if changed:
+                return changed
+
+def make_watcher(paths, interval, force_polling=False):
+    """Create an inotify watcher when available, otherwise a polling watcher."""
+    if not force_polling:
+        try:
+            return InotifyWatcher(paths)
+        except (ImportError, OSError):
+            pass
+    return PollingWatcher(paths, interval=interval)
+
+def watch(interval=0.25, force_polling=False, verbose=False):
+    """Run the full pipeline once, then re-run affected stages on every change."""
+    paths = list(DEPENDENT_STAGES)
+    state = PipelineState()
+    watcher = make_watcher(paths, interval, force_polling=force_polling)
+
+    print(f"Watching {', '.join(str(p) for p in paths)} ({type(watcher).__name__})")
+    print("Initial run:")
+    state.run(STAGE_ORDER, verbose=verbose)
+
+    try:
+        while True:
+            changed = watcher.wait()
+            stages = affected_stages(changed)
+            print(f"\nChanged: {', '.join(sorted(str(p) for p in changed))} -> {', '.join(stages)}")
+            if CATEGORIES_PATH in changed:
+                state.invalidate_categories()
+            if CANONICALIZATION_PATH in changed:
+                state.invalidate_canonicalization()
+            if INDEX_PATH in changed:
+                state.invalidate_index()
+            state.run(stages, verbose=verbose)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Re-run affected pipeline stages when inputs change")
+    parser.add_argument('--interval', type=float, default=0.25,
+                        help="polling interval in seconds when inotify is unavailable (default: 0.25)")
+    parser.add_argument('--poll', action='store_true',
+                        help="always poll instead of using inotify")
+    parser.add_argument('--verbose', action='store_true',
+                        help="show each stage's full output")
+    args = parser.parse_args(argv)
+
+    watch(interval=args.interval, force_polling=args.poll, verbose=args.verbose)
+
+if __name__ == '__main__':
+    main()
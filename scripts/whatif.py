@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Simulate a taxonomy change before editing config/categories.yml.
+Takes a candidate YAML and reports which links would move between sections,
+compared with the current temp/categorized.json.
+
+Only links whose search text contains an added or removed keyword are
+recategorized, found through a keyword -> link inverted index. A full
+recategorization happens only when the category priority order changes.
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from categorize_links import build_duplicates_lookup, categorize_link, load_categories
+from keyword_engine import (MATCH_WORD, TOKEN_PATTERN, KeywordEngine, contains_sequence, keyword_matches,
+                            keyword_spec, tokenize)
+
+def load_candidate(path):
+    """Load the categories mapping from a candidate YAML file."""
+    import yaml
+
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    return config['categories']
+
+def keyword_set(category_data):
+    """Return the (lowercased keyword, match mode) pairs of one category."""
+    specs = set()
+    for entry in category_data.get('keywords', []):
+        keyword, mode = keyword_spec(entry)
+        specs.add((keyword.lower(), mode))
+    return specs
+
+def changed_keywords(current, candidate):
+    """Return the (keyword, match mode) pairs added to or removed from any category."""
+    changed = set()
+    for category_id in current.keys() | candidate.keys():
+        before = keyword_set(current.get(category_id, {}))
+        after = keyword_set(candidate.get(category_id, {}))
+        changed |= before ^ after
+    return changed
+
+class KeywordLinkIndex:
+    """Inverted index from keyword to the positions of links containing it.
+
+    Token postings (token -> link positions) are built once up front. Word
+    keywords are answered from the postings of their tokens, substring
+    keywords made only of letters and digits from the tokens containing
+    them (they cannot span two tokens); only punctuated substring keywords
+    scan the links' search texts. Results are memoized per keyword.
+    """
+
+    def __init__(self, links):
+        self.search_texts = []
+        self.tokens = []
+        self.postings = {}
+        for position, link in enumerate(links):
+            # Include enrichment metadata so metadata-only matches are found too
+            text_lower = f"{link['href_norm']} {link['text_norm']} {link.get('meta_text', '')}".lower()
+            tokens = tokenize(text_lower)
+            self.search_texts.append(text_lower)
+            self.tokens.append(tokens)
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(position)
+        self.keyword_hits = {}
+
+    def word_links(self, sequence):
+        """Return the positions of links containing the token sequence."""
+        candidates = set.intersection(*(self.postings.get(token, set()) for token in sequence))
+        if len(sequence) == 1:
+            return candidates
+        return {position for position in candidates if contains_sequence(self.tokens[position], sequence)}
+
+    def links_for(self, keyword, mode):
+        """Return the set of link positions whose search text matches keyword."""
+        keyword = keyword.lower()
+        key = (keyword, mode)
+        if key in self.keyword_hits:
+            return self.keyword_hits[key]
+
+        sequence = tuple(tokenize(keyword)) if mode == MATCH_WORD else ()
+        if sequence:
+            hits = self.word_links(sequence)
+        elif TOKEN_PATTERN.fullmatch(keyword):
+            hits = set()
+            for token, positions in self.postings.items():
+                if keyword in token:
+                    hits |= positions
+        else:
+            hits = {
+                position for position, (text, tokens) in enumerate(zip(self.search_texts, self.tokens))
+                if keyword_matches(keyword, mode, text, tokens)
+            }
+        self.keyword_hits[key] = hits
+        return hits
+
+def simulate(links, baseline, current, candidate, duplicates_lookup):
+    """Recategorize affected links under the candidate rules and return the moves."""
+    full = list(current.keys()) != list(candidate.keys())
+
+    if full:
+        affected = range(len(links))
+        keywords = None
+    else:
+        keywords = changed_keywords(current, candidate)
+        # Invalid and duplicate links stay skipped whatever the keywords
+        eligible = [
+            (position, link) for position, link in enumerate(links)
+            if link['valid_url'] and duplicates_lookup.get(link['href_norm'], link['id']) == link['id']
+        ]
+        index = KeywordLinkIndex([link for _, link in eligible])
+        hits = set()
+        for keyword, mode in keywords:
+            hits |= index.links_for(keyword, mode)
+        affected = sorted(eligible[hit][0] for hit in hits)
+
+    engine = KeywordEngine(candidate)
+    moves = []
+    for position in affected:
+        link = links[position]
+        result = categorize_link(link, candidate, duplicates_lookup, engine)
+        before = baseline.get(link['id'])
+        before_category = before['category'] if before else None
+        if result['category'] != before_category:
+            moves.append({
+                'id': link['id'],
+                'href_norm': link['href_norm'],
+                'text': link['text_norm'],
+                'from': before_category,
+                'to': result['category'],
+                'reason': result['reason']
+            })
+
+    return {
+        'full_recategorization': full,
+        'changed_keywords': [
+            {'keyword': keyword, 'match': mode} for keyword, mode in sorted(keywords)
+        ] if keywords is not None else None,
+        'links_recategorized': len(affected),
+        'moves': moves
+    }
+
+def whatif(candidate_path, output_path='temp/whatif_report.json'):
+    """Compare the candidate taxonomy with the current categorization."""
+    start = time.perf_counter()
+
+    normalized_path = Path('temp/links_normalized.json')
+    categorized_path = Path('temp/categorized.json')
+    for path in (normalized_path, categorized_path):
+        if not path.exists():
+            print(f"Error: {path} not found. Run the pipeline first.", file=sys.stderr)
+            sys.exit(1)
+
+    with open(normalized_path, 'r', encoding='utf-8') as f:
+        links = json.load(f)
+    with open(categorized_path, 'r', encoding='utf-8') as f:
+        baseline = {link['id']: link for link in json.load(f)}
+
+    missing = sum(1 for link in links if link['id'] not in baseline)
+    if missing:
+        print(f"Error: {missing} normalized links are missing from {categorized_path}. "
+              "Re-run categorize_links.py first.", file=sys.stderr)
+        sys.exit(1)
+
+    current = load_categories()
+    candidate = load_candidate(candidate_path)
+    duplicates_lookup = build_duplicates_lookup()
+
+    result = simulate(links, baseline, current, candidate, duplicates_lookup)
+    transitions = Counter((move['from'] or 'none', move['to'] or 'none') for move in result['moves'])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    report = {
+        'candidate': str(candidate_path),
+        **result,
+        'total_moves': len(result['moves']),
+        'transitions': [
+            {'from': before, 'to': after, 'count': count}
+            for (before, after), count in transitions.most_common()
+        ],
+        'elapsed_ms': round(elapsed_ms, 1)
+    }
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    mode = "full recategorization (priority order changed)" if result['full_recategorization'] else \
+        f"{len(result['changed_keywords'])} changed keywords"
+    print(f"What-if for {candidate_path}: {mode}")
+    print(f"  - Links recategorized: {result['links_recategorized']}/{len(links)}")
+    print(f"  - Links that would move: {len(result['moves'])}")
+    for transition in report['transitions']:
+        print(f"    - {transition['from']} -> {transition['to']}: {transition['count']}")
+    print(f"  - Report written to: {output_path} ({elapsed_ms:.1f} ms)")
+
+    return report
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Preview category moves for a candidate categories.yml")
+    parser.add_argument('candidate', help="path to the candidate categories YAML")
+    parser.add_argument('--output', default='temp/whatif_report.json',
+                        help="where to write the JSON report (default: temp/whatif_report.json)")
+    args = parser.parse_args(argv)
+
+    whatif(args.candidate, args.output)
+
+if __name__ == '__main__':
+    main()
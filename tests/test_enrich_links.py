@@ -0,0 +1,158 @@
+"""Tests for scripts/enrich_links.py against a local http.server stand-in."""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import enrich_links  # noqa: E402
+
+PAGE = b"""<!DOCTYPE html>
+<html><head>
+<title>
+  Design Tokens
+  Guide</title>
+<meta property="og:title" content="Tokens &amp; Themes">
+<meta name="description" content="  How teams ship design tokens.  ">
+</head><body><p>Body</p></body></html>
+"""
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves the fixture pages; every request path is counted in server.requests."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_page(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == '/page':
+            self.send_page(200, 'text/html; charset=utf-8', PAGE)
+        elif self.path == '/split-head':
+            # </head> arrives split over two writes; the body only after a delay
+            # longer than the client timeout, so reading past </head> fails the fetch
+            head = b'<html><head><title>Split</title><meta name="description" content="head"></he'
+            rest = b'ad><body><meta name="description" content="body">' + b'x' * 100000
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(head) + len(rest)))
+            self.end_headers()
+            self.wfile.write(head)
+            self.wfile.flush()
+            time.sleep(0.1)
+            self.wfile.write(rest[:3])
+            self.wfile.flush()
+            time.sleep(2)
+            try:
+                self.wfile.write(rest[3:])
+            except OSError:
+                pass
+        elif self.path == '/file.pdf':
+            self.send_page(200, 'application/pdf', b'%PDF-1.4')
+        elif self.path == '/slow':
+            time.sleep(2)
+            try:
+                self.send_page(200, 'text/html', PAGE)
+            except OSError:
+                pass
+        else:
+            self.send_page(404, 'text/html', b'<html><head><title>Not found</title></head></html>')
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def fetch(urls, timeout=5):
+    return asyncio.run(enrich_links.fetch_all(urls, concurrency=4, per_host=4, timeout=timeout))
+
+def test_extracts_title_og_title_and_description(server):
+    url = base_url(server) + '/page'
+    metadata = fetch([url])[url]
+
+    assert metadata['title'] == 'Design Tokens Guide'
+    assert metadata['og_title'] == 'Tokens & Themes'
+    assert metadata['description'] == 'How teams ship design tokens.'
+    assert enrich_links.build_meta_text(metadata) == (
+        'Design Tokens Guide Tokens & Themes How teams ship design tokens.')
+
+def test_stops_reading_at_head_end_split_across_chunks(server):
+    url = base_url(server) + '/split-head'
+    metadata = fetch([url], timeout=1)[url]
+
+    assert 'error' not in metadata
+    assert metadata['title'] == 'Split'
+    assert metadata['description'] == 'head'
+
+def test_skips_non_html_responses(server):
+    url = base_url(server) + '/file.pdf'
+
+    assert fetch([url])[url]['error'] == 'not_html:application/pdf'
+
+def test_reports_http_errors_timeouts_and_connection_failures(server):
+    missing = base_url(server) + '/missing'
+    slow = base_url(server) + '/slow'
+    # A port nothing listens on once the probe server is closed
+    probe = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    refused = f"http://127.0.0.1:{probe.server_address[1]}/page"
+    probe.server_close()
+
+    results = fetch([missing, slow, refused], timeout=0.5)
+
+    assert results[missing]['error'] == 'http_404'
+    assert results[slow]['error'].startswith('TimeoutError')
+    assert results[refused]['error'].startswith('ClientConnectorError')
+    assert all('fetched_at' in metadata for metadata in results.values())
+
+def test_second_run_is_served_from_cache(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'temp').mkdir()
+    page = base_url(server) + '/page'
+    links = [
+        {'id': 'a', 'href_norm': page, 'valid_url': True},
+        {'id': 'b', 'href_norm': page, 'valid_url': True},
+        {'id': 'c', 'href_norm': base_url(server) + '/file.pdf', 'valid_url': True},
+        {'id': 'd', 'href_norm': None, 'valid_url': False}
+    ]
+    with open('temp/links_normalized.json', 'w', encoding='utf-8') as f:
+        json.dump(links, f)
+
+    first = enrich_links.enrich_links(concurrency=2, timeout=5, batch_size=1)
+    requests_after_first = len(server.requests)
+    second = enrich_links.enrich_links(concurrency=2, timeout=5, batch_size=1)
+
+    assert first['fetched'] == 2
+    assert second['fetched'] == 0
+    assert len(server.requests) == requests_after_first == 2
+    assert second['enriched_links'] == 2
+
+    with open('temp/links_normalized.json', 'r', encoding='utf-8') as f:
+        enriched = json.load(f)
+    assert [link['meta_text'] for link in enriched] == [
+        'Design Tokens Guide Tokens & Themes How teams ship design tokens.',
+        'Design Tokens Guide Tokens & Themes How teams ship design tokens.',
+        '',
+        ''
+    ]